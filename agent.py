@@ -1,9 +1,18 @@
 import os
 import re
 import json
+import hashlib
+import functools
 from datetime import datetime, timezone
 from google import genai
+from google.genai import types
 from config import GEMINI_MODEL
+from memory import extract_active_rules
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 _MAX_USER_INPUT = 2000  # max chars accepted from Telegram user before entering AI prompt
 
@@ -11,6 +20,40 @@ _VALID_CORRECTION_CATEGORIES = frozenset({
     "narrative timing", "price structure", "social signal", "macro", "data quality"
 })
 
+# Crypto/stocks boundary — primary delimiter plus the fallback section headers,
+# in one alternation so the split is a single scan (and works incrementally on
+# a growing stream buffer)
+_SPLIT_RE = re.compile(r"===STOCKS===|📈 STOCKS|STOCKS —|STOCKS-")
+
+# Explicit prompt caching — each static prefix below is uploaded to Gemini once
+# per process (per prefix content) and referenced by cache name on every call,
+# so only the small dynamic suffix is re-sent and re-prefilled.
+_CACHE_TTL = "3600s"
+_PROMPT_CACHES: dict[str, str | None] = {}  # prefix digest -> cache name (None = caching unavailable)
+
+
+def serialize_payload(crypto_data: dict, stock_data: dict) -> str:
+    """Serialize the market payload once for reuse across all prompts.
+
+    Compact output — indented JSON inflates the prompt token count for no
+    analytical benefit. orjson handles datetimes natively and is several
+    times faster than stdlib json; falls back to stdlib when unavailable.
+    """
+    payload = {"crypto": crypto_data, "stocks": stock_data}
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+@functools.lru_cache(maxsize=4)
+def _active_rules(learnings: str) -> str:
+    """Extract the Active Rules section from LEARNINGS.md content.
+
+    Memoized — LEARNINGS.md only changes on corrections, so repeated /ask
+    calls skip the scan entirely.
+    """
+    return extract_active_rules(learnings)
+
 
 def _sanitize_user_input(text: str) -> str:
     """Strip prompt-delimiter sequences and cap length for user-controlled input."""
@@ -34,24 +77,102 @@ def _validate_correction(c: object) -> bool:
     return True
 
 
-def _setup_client() -> genai.Client:
+@functools.lru_cache(maxsize=1)
+def _client() -> genai.Client:
+    """Lazily build one shared Gemini client — reused across all agent calls.
+
+    A single client keeps one underlying HTTP connection pool alive, so
+    repeated calls skip TCP+TLS setup instead of handshaking every time.
+    """
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY is not set in your .env file")
     return genai.Client(api_key=api_key)
 
 
-def generate_market_update(crypto_data: dict, stock_data: dict) -> tuple[str, str]:
-    """Returns (crypto_message, stock_message) as two separate strings."""
-    client = _setup_client()
+def _cached_prefix(prefix: str) -> str | None:
+    """Create (once per process per prefix) an explicit Gemini cache for a static prefix.
+
+    Returns the cache name, or None if caching is unavailable (prefix below the
+    model's minimum token count, older API, network error). Failures are memoized
+    so we don't retry the cache create on every call.
+    """
+    key = hashlib.blake2b(prefix.encode("utf-8"), digest_size=16).hexdigest()
+    if key in _PROMPT_CACHES:
+        return _PROMPT_CACHES[key]
+
+    client = _client()
+    try:
+        cache = client.caches.create(
+            model=GEMINI_MODEL,
+            config=types.CreateCachedContentConfig(contents=[prefix], ttl=_CACHE_TTL),
+        )
+        name = cache.name
+    except Exception:
+        name = None
+    _PROMPT_CACHES[key] = name
+    return name
+
+
+def _consume_stream(stream, on_chunk) -> str:
+    """Drain a generate_content_stream, reporting the growing text after each chunk."""
+    parts = []
+    for chunk in stream:
+        if chunk.text:
+            parts.append(chunk.text)
+            on_chunk("".join(parts))
+    return "".join(parts)
+
+
+def _generate(prefix: str, suffix: str, on_chunk=None) -> str:
+    """Generate with the static prefix served from Gemini's cache when possible.
+
+    When on_chunk is given, the response is streamed and on_chunk is called with
+    the accumulated text after every chunk — callers can act on partial output
+    (first tokens arrive in a fraction of the full generation time).
+    Falls back to sending the full prompt inline if the cache can't be created
+    or has expired server-side.
+    """
+    client = _client()
+
+    cache_name = _cached_prefix(prefix)
+    if cache_name:
+        try:
+            config = types.GenerateContentConfig(cached_content=cache_name)
+            if on_chunk is None:
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL, contents=suffix, config=config,
+                )
+                return response.text
+            return _consume_stream(
+                client.models.generate_content_stream(
+                    model=GEMINI_MODEL, contents=suffix, config=config,
+                ),
+                on_chunk,
+            )
+        except Exception:
+            # Cache rejected or expired — forget it and fall through to inline
+            key = hashlib.blake2b(prefix.encode("utf-8"), digest_size=16).hexdigest()
+            _PROMPT_CACHES[key] = None
+
+    if on_chunk is None:
+        response = client.models.generate_content(model=GEMINI_MODEL, contents=prefix + suffix)
+        return response.text
+    return _consume_stream(
+        client.models.generate_content_stream(model=GEMINI_MODEL, contents=prefix + suffix),
+        on_chunk,
+    )
 
-    prompt = f"""You are a sharp, no-fluff financial analyst writing a daily market briefing for an active retail investor.
 
-Below is today's raw market data. Analyze it and produce a concise, high-signal update.
+# ---------------------------------------------------------------------------
+# Static prompt prefixes
+# Everything stable lives up here so it caches; the volatile data (today's
+# JSON, timestamps, the user question) is appended as a small dynamic suffix.
+# ---------------------------------------------------------------------------
 
---- RAW DATA ---
-{json.dumps({"crypto": crypto_data, "stocks": stock_data}, indent=2, default=str)}
---- END DATA ---
+_MARKET_UPDATE_PREFIX = """You are a sharp, no-fluff financial analyst writing a daily market briefing for an active retail investor.
+
+At the end of this message you will receive today's raw market data. Analyze it and produce a concise, high-signal update.
 
 Structure your response in EXACTLY two parts separated by the line ===STOCKS=== and nothing else.
 
@@ -111,24 +232,215 @@ Rules:
 - Formatting: use *word* for bold (single asterisk). Use - for bullet points. NEVER use * as a bullet character.
 """
 
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    text = response.text
+_AUTO_CORRECTION_PREFIX = """You are Sarah, a self-auditing market intelligence agent.
+
+At the end of this message you will receive your PREVIOUS BRAIN.md (from the last run) followed by TODAY'S fresh market data.
+
+Your job: compare your previous active hypotheses (H1, H2, H3) and any specific price/regime calls
+against what the market actually did. Identify only hypotheses that are CLEARLY WRONG or CLEARLY INVALIDATED
+by the new data — not just uncertain or unresolved.
+
+Be conservative. Only log a correction if the data clearly contradicts a specific, testable prediction.
+If a hypothesis is still open, inconclusive, or directionally correct but off on timing — do NOT log it.
+
+Output a JSON array of corrections. Each correction must have exactly these fields:
+  "title"        — short description, format: "[DATE] — [what was wrong]" where DATE is today's date given below
+  "what_i_said"  — the exact hypothesis or call from the previous brain
+  "what_happened" — what the market actually did (be specific with prices/percentages)
+  "root_cause"   — why the call was wrong (anchoring? wrong macro read? narrative timing? data quality?)
+  "rule_update"  — one concrete rule Sarah should follow differently going forward
+  "category"     — one of: narrative timing / price structure / social signal / macro / data quality
+
+If there are no clearly invalidated hypotheses, output exactly: []
+
+Output only the JSON array, nothing else. No prose before or after it.
+"""
+
+_BRAIN_UPDATE_PREFIX = """You are a market intelligence agent updating your live working memory file after a market analysis run.
+
+At the end of this message you will receive today's date/time, the key market metrics, and the analysis you just produced. Your job is to output a fully populated BRAIN.md file.
+Replace every placeholder in brackets with real, specific content based on the data. Be precise — no generic filler.
+
+Output the complete BRAIN.md file content using exactly this structure. Fill in every field with real data:
+
+# BRAIN.md — Live Working Memory
+
+## Purpose
+
+This is the agent's active mental state. It is overwritten on every run.
+It represents what the agent currently believes, what it is tracking, and what it is watching for.
+
+---
+
+## Last Updated
+`[today's date/time exactly as given below]`
+
+---
+
+## Current Market Regime
 
-    if "===STOCKS===" in text:
-        parts = text.split("===STOCKS===", 1)
-        return parts[0].strip(), parts[1].strip()
+```
+Risk Appetite:     [ RISK-ON / RISK-OFF / NEUTRAL — pick one and state why in 3-5 words ]
+BTC Trend:         [ UPTREND / DOWNTREND / RANGING — pick one ]
+BTC Dominance:     [ RISING / FALLING / FLAT ] → [ one-line implication for alts ]
+Alt Season:        [ EARLY / ACTIVE / LATE / NONE ]
+Macro Backdrop:    [ one sentence on the dominant macro force today ]
+VIX Level:         [ number + one-word interpretation: low/elevated/spiking ]
+DXY Trend:         [ direction + one-line crypto implication ]
+```
 
-    # Fallback: split at first stocks section header if delimiter missing
-    for marker in ["📈 STOCKS", "STOCKS —", "STOCKS-"]:
-        idx = text.find(marker)
-        if idx != -1:
-            return text[:idx].strip(), text[idx:].strip()
+---
 
-    # Last resort: return full text as crypto, empty stocks
-    return text.strip(), ""
+## Active Hypotheses
 
+```
+H1: [specific, testable hypothesis about price or narrative] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
+H2: [specific, testable hypothesis] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
+H3: [specific, testable hypothesis] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
+```
 
-def generate_auto_correction(old_brain: str, crypto_data: dict, stock_data: dict) -> list[dict]:
+---
+
+## Watchlist — High Priority
+
+| Asset / Sector | Why I'm Watching | Trigger to Act |
+|----------------|-----------------|----------------|
+| BTC | [specific reason from today's data] | [specific price level or event] |
+| SOL | [specific reason] | [specific trigger] |
+| HYPE | [specific reason] | [specific trigger] |
+| [top sector from today] | [reason] | [trigger] |
+
+---
+
+## Narrative Tracker
+
+```
+HEATING UP (early, not crowded):
+- [specific narrative with brief evidence]
+
+PEAK ATTENTION (crowded, watch for exit):
+- [specific narrative]
+
+COOLING DOWN (fading, any reversal?):
+- [specific narrative]
+
+OVERLOOKED (no CT attention, but data is interesting):
+- [specific narrative]
+```
+
+---
+
+## Open Questions
+
+1. [specific question the data raised but didn't answer]
+2. [specific question]
+3. [specific question]
+
+---
+
+## What I Was Wrong About Last Run
+
+`[If this is the first run: "No prior run to review." Otherwise: brief summary of last error.]`
+
+---
+
+## What I Am Most Confident About Right Now
+
+`[One or two sentences — the single clearest, highest-conviction signal in today's data. Be specific.]`
+"""
+
+_SELF_REVIEW_PREFIX = """You are a self-auditing market agent running a 4-hour accountability review.
+
+At the end of this message you will receive the current timestamp and your current BRAIN.md — your live working memory from the last market update run.
+Review it critically. Reflect on whether the hypotheses and regime calls hold up.
+Flag what may have played out, what looks shaky, and what you'd change in your framing.
+
+Produce a single review log entry in exactly this format (no extra commentary before or after), using the timestamp given below:
+
+---
+
+**TIMESTAMP: [timestamp exactly as given below]**
+
+**1. WHAT DID I CALL?**
+- [list the specific hypotheses, regime calls, and watchlist triggers from the brain above]
+
+**2. WHAT DO I NEED TO WATCH NEXT?**
+- [what specific data or price moves would confirm or invalidate H1/H2/H3]
+
+**3. WHAT LOOKS SHAKY?**
+- [which calls feel weakest or most likely to be wrong — be honest]
+
+**4. WHY MIGHT I BE WRONG?**
+- [root cause: anchoring? missing data? narrative bias? recency effect?]
+
+**5. WHAT CHANGES IN THE NEXT UPDATE?**
+- [one concrete adjustment to weighting, framing, or focus]
+
+---
+"""
+
+_ANSWER_PERSONA = """You are Sarah, a market intelligence agent answering a question from your operator.
+Answer in your own voice, grounded in your current market state and operating rules.
+Be direct, specific, and useful. No filler. No hedging.
+Use the conversation history to maintain context across follow-up messages.
+Use single *bold* for emphasis (Telegram markdown format — single asterisk only, never double).
+"""
+
+
+def generate_market_update(payload_str: str, on_crypto=None) -> tuple[str, str]:
+    """Returns (crypto_message, stock_message) as two separate strings.
+
+    payload_str is the pre-serialized market payload from serialize_payload().
+    If on_crypto is given it is called exactly once with the crypto half —
+    as soon as the ===STOCKS=== delimiter appears in the stream, so the first
+    message can go out while the stocks half is still generating.
+    """
+    suffix = f"""
+--- RAW DATA ---
+{payload_str}
+--- END DATA ---
+"""
+
+    state = {"fired": False}
+
+    def _watch(buffer: str) -> None:
+        if state["fired"]:
+            return
+        m = _SPLIT_RE.search(buffer)
+        if m:
+            state["fired"] = True
+            on_crypto(buffer[:m.start()].strip())
+
+    text = _generate(_MARKET_UPDATE_PREFIX, suffix,
+                     on_chunk=_watch if on_crypto else None)
+
+    if on_crypto and not state["fired"]:
+        # Delimiter never streamed by itself — fire with the final crypto part
+        state["fired"] = True
+        on_crypto(_split_market_text(text)[0])
+
+    return _split_market_text(text)
+
+
+def _split_market_text(text: str) -> tuple[str, str]:
+    """Split the model output into (crypto, stocks) parts in one scan.
+
+    The explicit ===STOCKS=== delimiter is dropped from the output; a fallback
+    section header is kept as the start of the stocks half. No marker at all
+    means the whole text is crypto.
+    """
+    # Fast path: the delimiter the prompt asks for — one C-level scan, no
+    # regex machinery, and partition avoids split's list allocation
+    crypto, sep, stocks = text.partition("===STOCKS===")
+    if sep:
+        return crypto.strip(), stocks.strip()
+    m = _SPLIT_RE.search(text)
+    if not m:
+        return text.strip(), ""
+    return text[:m.start()].strip(), text[m.start():].strip()
+
+
+def generate_auto_correction(old_brain: str, payload_str: str) -> list[dict]:
     """Compare previous BRAIN.md hypotheses against fresh market data.
 
     Returns a list of dicts (one per invalidated hypothesis), each with keys:
@@ -142,42 +454,19 @@ def generate_auto_correction(old_brain: str, crypto_data: dict, stock_data: dict
     if "No prior run" in old_brain or "Active Hypotheses" not in old_brain:
         return []
 
-    client = _setup_client()
-
-    prompt = f"""You are Sarah, a self-auditing market intelligence agent.
-
-Below is your PREVIOUS BRAIN.md (from the last run) followed by TODAY'S fresh market data.
-
-Your job: compare your previous active hypotheses (H1, H2, H3) and any specific price/regime calls
-against what the market actually did. Identify only hypotheses that are CLEARLY WRONG or CLEARLY INVALIDATED
-by the new data — not just uncertain or unresolved.
-
-Be conservative. Only log a correction if the data clearly contradicts a specific, testable prediction.
-If a hypothesis is still open, inconclusive, or directionally correct but off on timing — do NOT log it.
+    suffix = f"""
+Today's date (use as DATE in correction titles): {datetime.now().strftime("%Y-%m-%d")}
 
 --- PREVIOUS BRAIN.md ---
 {old_brain}
 --- END PREVIOUS BRAIN ---
 
 --- TODAY'S FRESH MARKET DATA ---
-{json.dumps({"crypto": crypto_data, "stocks": stock_data}, indent=2, default=str)}
+{payload_str}
 --- END FRESH DATA ---
-
-Output a JSON array of corrections. Each correction must have exactly these fields:
-  "title"        — short description, format: "[DATE] — [what was wrong]" where DATE is {datetime.now().strftime("%Y-%m-%d")}
-  "what_i_said"  — the exact hypothesis or call from the previous brain
-  "what_happened" — what the market actually did (be specific with prices/percentages)
-  "root_cause"   — why the call was wrong (anchoring? wrong macro read? narrative timing? data quality?)
-  "rule_update"  — one concrete rule Sarah should follow differently going forward
-  "category"     — one of: narrative timing / price structure / social signal / macro / data quality
-
-If there are no clearly invalidated hypotheses, output exactly: []
-
-Output only the JSON array, nothing else. No prose before or after it.
 """
 
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    text = response.text.strip()
+    text = _generate(_AUTO_CORRECTION_PREFIX, suffix).strip()
 
     # Strip markdown code fences if model wrapped output
     if text.startswith("```"):
@@ -200,7 +489,7 @@ def generate_rule_promotion(corrections: list[dict], current_rules: str) -> str:
 
     Returns the full replacement text starting with the heading line.
     """
-    client = _setup_client()
+    client = _client()
 
     corrections_text = "\n\n".join(
         f"- Title: {c.get('title', '')}\n"
@@ -250,7 +539,7 @@ def generate_soul_refinement(soul: str, learnings: str, recent_reviews: str) ->
 
     Returns the complete new SOUL.md content.
     """
-    client = _setup_client()
+    client = _client()
 
     # Active rules + mistake log only (skip graduated rules to save tokens)
     graduated_idx = learnings.find("## Graduated Rules")
@@ -289,177 +578,52 @@ Output ONLY the complete refined SOUL.md, starting with: # SOUL.md — Who I Am"
     return response.text.strip()
 
 
-def generate_brain_update(crypto_data: dict, stock_data: dict, analysis: str) -> str:
-    """Generate a fully populated BRAIN.md based on current run data. Returns entire file content."""
-    client = _setup_client()
-
-    prompt = f"""You are a market intelligence agent updating your live working memory file after a market analysis run.
-
-Today's date/time: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+def generate_brain_update(analysis: str, key_metrics: dict) -> str:
+    """Generate a fully populated BRAIN.md based on current run data. Returns entire file content.
 
-Below is the raw market data and the analysis you just produced. Your job is to output a fully populated BRAIN.md file.
-Replace every placeholder in brackets with real, specific content based on the data. Be precise — no generic filler.
+    The analysis text already summarizes the full payload, so only a small
+    hand-picked metrics dict rides along — resending the raw JSON roughly
+    doubled the prompt for no extra signal.
+    """
+    suffix = f"""
+Today's date/time (use for the Last Updated field): {datetime.now().strftime("%Y-%m-%d %H:%M")}
 
---- RAW DATA ---
-{json.dumps({"crypto": crypto_data, "stocks": stock_data}, indent=2, default=str)}
---- END DATA ---
+--- KEY METRICS ---
+{json.dumps(key_metrics, indent=2, default=str)}
+--- END METRICS ---
 
 --- TODAY'S ANALYSIS ---
 {analysis}
 --- END ANALYSIS ---
-
-Output the complete BRAIN.md file content using exactly this structure. Fill in every field with real data:
-
-# BRAIN.md — Live Working Memory
-
-## Purpose
-
-This is the agent's active mental state. It is overwritten on every run.
-It represents what the agent currently believes, what it is tracking, and what it is watching for.
-
----
-
-## Last Updated
-`{datetime.now().strftime("%Y-%m-%d %H:%M")}`
-
----
-
-## Current Market Regime
-
-```
-Risk Appetite:     [ RISK-ON / RISK-OFF / NEUTRAL — pick one and state why in 3-5 words ]
-BTC Trend:         [ UPTREND / DOWNTREND / RANGING — pick one ]
-BTC Dominance:     [ RISING / FALLING / FLAT ] → [ one-line implication for alts ]
-Alt Season:        [ EARLY / ACTIVE / LATE / NONE ]
-Macro Backdrop:    [ one sentence on the dominant macro force today ]
-VIX Level:         [ number + one-word interpretation: low/elevated/spiking ]
-DXY Trend:         [ direction + one-line crypto implication ]
-```
-
----
-
-## Active Hypotheses
-
-```
-H1: [specific, testable hypothesis about price or narrative] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
-H2: [specific, testable hypothesis] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
-H3: [specific, testable hypothesis] — Confidence: [LOW/MEDIUM/HIGH] — Status: [FORMING/ACTIVE/INVALIDATED]
-```
-
----
-
-## Watchlist — High Priority
-
-| Asset / Sector | Why I'm Watching | Trigger to Act |
-|----------------|-----------------|----------------|
-| BTC | [specific reason from today's data] | [specific price level or event] |
-| SOL | [specific reason] | [specific trigger] |
-| HYPE | [specific reason] | [specific trigger] |
-| [top sector from today] | [reason] | [trigger] |
-
----
-
-## Narrative Tracker
-
-```
-HEATING UP (early, not crowded):
-- [specific narrative with brief evidence]
-
-PEAK ATTENTION (crowded, watch for exit):
-- [specific narrative]
-
-COOLING DOWN (fading, any reversal?):
-- [specific narrative]
-
-OVERLOOKED (no CT attention, but data is interesting):
-- [specific narrative]
-```
-
----
-
-## Open Questions
-
-1. [specific question the data raised but didn't answer]
-2. [specific question]
-3. [specific question]
-
----
-
-## What I Was Wrong About Last Run
-
-`[If this is the first run: "No prior run to review." Otherwise: brief summary of last error.]`
-
----
-
-## What I Am Most Confident About Right Now
-
-`[One or two sentences — the single clearest, highest-conviction signal in today's data. Be specific.]`
 """
 
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    return response.text
+    return _generate(_BRAIN_UPDATE_PREFIX, suffix)
 
 
 def generate_self_review(brain_content: str) -> str:
     """Review current brain state and produce a log entry to prepend to SELF-REVIEW.md."""
-    client = _setup_client()
-
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    prompt = f"""You are a self-auditing market agent running a 4-hour accountability review.
-
+    suffix = f"""
 Current timestamp: {timestamp}
 
-Below is your current BRAIN.md — your live working memory from the last market update run.
-Review it critically. Reflect on whether the hypotheses and regime calls hold up.
-Flag what may have played out, what looks shaky, and what you'd change in your framing.
-
 --- BRAIN.md ---
 {brain_content}
 --- END BRAIN.md ---
-
-Produce a single review log entry in exactly this format (no extra commentary before or after):
-
----
-
-**TIMESTAMP: {timestamp}**
-
-**1. WHAT DID I CALL?**
-- [list the specific hypotheses, regime calls, and watchlist triggers from the brain above]
-
-**2. WHAT DO I NEED TO WATCH NEXT?**
-- [what specific data or price moves would confirm or invalidate H1/H2/H3]
-
-**3. WHAT LOOKS SHAKY?**
-- [which calls feel weakest or most likely to be wrong — be honest]
-
-**4. WHY MIGHT I BE WRONG?**
-- [root cause: anchoring? missing data? narrative bias? recency effect?]
-
-**5. WHAT CHANGES IN THE NEXT UPDATE?**
-- [one concrete adjustment to weighting, framing, or focus]
-
----
 """
 
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    return response.text
+    return _generate(_SELF_REVIEW_PREFIX, suffix)
 
 
 def answer_question(question: str, soul: str, brain: str, learnings: str,
-                    history: list[dict] | None = None) -> str:
-    """Answer a freeform question using agent persona, current memory, and conversation history."""
-    question = _sanitize_user_input(question)
-    client = _setup_client()
+                    history: list[dict] | None = None, on_chunk=None) -> str:
+    """Answer a freeform question using agent persona, current memory, and conversation history.
 
-    rules_start = learnings.find("## Active Rules")
-    rules_end   = learnings.find("## Mistake Log")
-    if rules_start != -1 and rules_end != -1:
-        active_rules = learnings[rules_start:rules_end].strip()
-    elif rules_start != -1:
-        active_rules = learnings[rules_start:rules_start + 2000].strip()
-    else:
-        active_rules = learnings[:2000]
+    If on_chunk is given the answer is streamed and on_chunk receives the
+    accumulated text after each chunk (used for in-place Telegram edits).
+    """
+    question = _sanitize_user_input(question)
+    active_rules = _active_rules(learnings)
 
     # Format recent conversation so Sarah remembers context
     history_block = ""
@@ -472,18 +636,17 @@ def answer_question(question: str, soul: str, brain: str, learnings: str,
 
     current_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
-    prompt = f"""You are Sarah, a market intelligence agent answering a question from your operator.
-Answer in your own voice, grounded in your current market state and operating rules.
-Be direct, specific, and useful. No filler. No hedging.
-Use the conversation history to maintain context across follow-up messages.
-Use single *bold* for emphasis (Telegram markdown format — single asterisk only, never double).
-
-CURRENT TIME: {current_utc}
-(Use this for any time-related questions. Do NOT use the Last Updated field in BRAIN.md as a proxy for the current time.)
-
+    # Persona + SOUL.md change rarely — they form the cacheable prefix.
+    # Everything volatile (time, brain, rules, history, question) goes in the suffix.
+    prefix = f"""{_ANSWER_PERSONA}
 --- WHO YOU ARE (SOUL.md) ---
 {soul}
 --- END SOUL ---
+"""
+
+    suffix = f"""
+CURRENT TIME: {current_utc}
+(Use this for any time-related questions. Do NOT use the Last Updated field in BRAIN.md as a proxy for the current time.)
 
 --- YOUR CURRENT BRAIN STATE (BRAIN.md) ---
 {brain}
@@ -499,5 +662,4 @@ CURRENT TIME: {current_utc}
 
 Answer:"""
 
-    response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
-    return response.text
+    return _generate(prefix, suffix, on_chunk=on_chunk)
@@ -5,25 +5,28 @@ Usage: python bot.py
 import os
 import re
 import time
+import hashlib
 import threading
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # Load env before any os.getenv calls
 from dotenv import load_dotenv
 load_dotenv()
 
-import schedule
-
 from main import build_crypto_payload, build_stock_payload
 from agent import (generate_market_update, generate_brain_update, generate_self_review,
                    answer_question, generate_auto_correction,
-                   generate_rule_promotion, generate_soul_refinement)
+                   generate_rule_promotion, generate_soul_refinement, serialize_payload)
 from grok_agent import get_x_social_pulse
-from telegram_bot import send_message, get_updates, send_reply, send_photo
+from telegram_bot import (send_message, get_updates, send_reply, send_photo,
+                          send_placeholder, edit_message, finalize_stream)
 from memory import (read_file, write_brain, log_review, log_learning,
+                    extract_active_rules,
                     load_conversation, save_message,
                     update_active_rules, update_soul,
-                    record_soul_correction, should_update_soul, mark_soul_updated)
+                    record_soul_correction, should_update_soul, mark_soul_updated,
+                    load_payload_fingerprint, save_payload_fingerprint)
 from chart import get_crypto_chart, get_stock_chart
 
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
@@ -41,6 +44,80 @@ if not re.fullmatch(r"\d{2}:\d{2}", UPDATE_TIME):
 # Scheduled jobs
 # ---------------------------------------------------------------------------
 
+_CORRECTION_SKIP_THRESHOLD_PCT = 0.5  # skip the correction check if no key metric moved more than this
+
+
+def _payload_fingerprint(payload_str: str, crypto_data: dict, stock_data: dict) -> dict:
+    """Hash + key metrics of a run's market payload, for change detection."""
+    metrics = {}
+    for coin in crypto_data.get("watchlist") or []:
+        if coin.get("symbol") and coin.get("price_usd"):
+            metrics[coin["symbol"]] = coin["price_usd"]
+    dxy_level = (stock_data.get("dxy") or {}).get("level")
+    if dxy_level:
+        metrics["DXY"] = dxy_level
+    return {
+        "hash":    hashlib.blake2b(payload_str.encode("utf-8"), digest_size=16).hexdigest(),
+        "metrics": metrics,
+    }
+
+
+def _key_metrics(crypto_data: dict, stock_data: dict) -> dict:
+    """Hand-pick the handful of fields the BRAIN.md template actually references."""
+    metrics = {}
+    for coin in crypto_data.get("watchlist") or []:
+        if coin.get("symbol"):
+            metrics[coin["symbol"]] = {
+                "price_usd":      coin.get("price_usd"),
+                "change_24h_pct": coin.get("change_24h_pct"),
+            }
+
+    dxy = stock_data.get("dxy") or {}
+    if dxy.get("level"):
+        metrics["DXY"] = {"level": dxy.get("level"), "trend": dxy.get("trend")}
+
+    vix = (stock_data.get("major_indices") or {}).get("VIX (Fear Index)") or {}
+    if vix.get("price"):
+        metrics["VIX"] = vix["price"]
+
+    sectors = {
+        name: perf["change_1d_pct"]
+        for name, perf in (stock_data.get("sector_etfs") or {}).items()
+        if isinstance(perf, dict) and perf.get("change_1d_pct") is not None
+    }
+    if sectors:
+        top = max(sectors, key=sectors.get)
+        metrics["top_sector"] = {"name": top, "change_1d_pct": sectors[top]}
+
+    stables = (crypto_data.get("stablecoin_supply") or {}).get("total_stablecoin_mcap_usd")
+    if stables:
+        metrics["total_stablecoin_mcap_usd"] = stables
+
+    return metrics
+
+
+def _market_moved(prev: dict, current: dict) -> bool:
+    """True if any shared key metric moved past the skip threshold since last run.
+
+    Unchanged data can't clearly invalidate a hypothesis, so the expensive
+    correction LLM call is pointless on a flat tape. Err on the side of
+    running the check when metrics are missing or malformed.
+    """
+    prev_metrics    = prev.get("metrics") or {}
+    current_metrics = current.get("metrics") or {}
+    shared = set(prev_metrics) & set(current_metrics)
+    if not shared:
+        return True
+    for key in shared:
+        try:
+            old, new = float(prev_metrics[key]), float(current_metrics[key])
+        except (TypeError, ValueError):
+            return True
+        if old == 0 or abs(new - old) / abs(old) * 100 > _CORRECTION_SKIP_THRESHOLD_PCT:
+            return True
+    return False
+
+
 def run_full_update():
     """Fetch data, generate analysis, update BRAIN.md, send to Telegram."""
     try:
@@ -50,13 +127,88 @@ def run_full_update():
         # Read previous brain BEFORE fetching new data — used for self-correction
         old_brain = read_file("BRAIN.md")
 
-        crypto_data = build_crypto_payload()
-        stock_data = build_stock_payload()
+        # Both builders are pure network I/O with no shared state — overlap
+        # them so the fetch takes max(crypto_time, stock_time) instead of the sum
+        with ThreadPoolExecutor(max_workers=2) as fetch_pool:
+            fut_crypto = fetch_pool.submit(build_crypto_payload)
+            fut_stock  = fetch_pool.submit(build_stock_payload)
+            crypto_data = fut_crypto.result()
+            stock_data  = fut_stock.result()
+
+        # Serialize once — the same payload feeds three separate prompts
+        payload_str = serialize_payload(crypto_data, stock_data)
+
+        # Correction check is the most expensive LLM call — skip it entirely
+        # when the market is byte-identical or hasn't materially moved
+        fingerprint = _payload_fingerprint(payload_str, crypto_data, stock_data)
+        prev_fingerprint = load_payload_fingerprint()
+        run_correction_check = (
+            not prev_fingerprint
+            or (prev_fingerprint.get("hash") != fingerprint["hash"]
+                and _market_moved(prev_fingerprint, fingerprint))
+        )
+
+        # The correction check, the market analysis, and the social pulse are
+        # independent LLM calls — fan them out so their latencies overlap.
+        # All calls block in network I/O, so threads are fine here; extra
+        # workers cover the brain update and the tail Telegram sends.
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            fut_corrections = None
+            if run_correction_check:
+                fut_corrections = executor.submit(generate_auto_correction, old_brain, payload_str)
+            else:
+                print("  ✓ Market unchanged since last run — skipping correction check")
+
+            header = f"🗓 *Daily Market Update — {date_str}*\n{'─' * 34}\n\n"
+
+            def _send_crypto(crypto_text: str) -> None:
+                # Fired from the stream the moment the crypto half is complete —
+                # the stocks half is still generating at this point
+                send_message(header + crypto_text)
+                print("  ✓ Crypto update sent (streamed)")
+
+            print("  Generating analysis with Gemini...")
+            fut_analysis = executor.submit(generate_market_update, payload_str, _send_crypto)
+            print("  Fetching X social pulse with Grok...")
+            fut_social = executor.submit(get_x_social_pulse)
+
+            crypto_analysis, stock_analysis = fut_analysis.result()
+
+            # Brain update only needs the analysis text — start it while the
+            # social pulse and correction check may still be in flight.
+            print("  Updating BRAIN.md...")
+            fut_brain = executor.submit(
+                generate_brain_update,
+                crypto_analysis + "\n\n" + stock_analysis,
+                _key_metrics(crypto_data, stock_data),
+            )
+
+            social_pulse = ""
+            try:
+                social_pulse = fut_social.result()
+            except Exception as e:
+                print(f"  ✗ X social pulse — {e}")
+
+            # Crypto already went out mid-stream; dispatch the remaining
+            # messages together so their round trips overlap
+            tail_messages = [m for m in (social_pulse, stock_analysis) if m]
+            for fut in [executor.submit(send_message, m) for m in tail_messages]:
+                fut.result()
+
+            print("  ✓ Sent to Telegram")
+
+            # Auto-correction: compare old hypotheses against fresh data
+            corrections = []
+            if fut_corrections is not None:
+                print("  Checking previous hypotheses for corrections...")
+                try:
+                    corrections = fut_corrections.result()
+                except Exception as e:
+                    print(f"  ✗ Auto-correction check failed: {e}")
+
+            brain_content = fut_brain.result()
 
-        # Auto-correction: compare old hypotheses against fresh data
-        print("  Checking previous hypotheses for corrections...")
         try:
-            corrections = generate_auto_correction(old_brain, crypto_data, stock_data)
             if corrections:
                 for c in corrections:
                     title = c.get("title", "Unknown")
@@ -96,7 +248,7 @@ def run_full_update():
             else:
                 print("  ✓ No corrections needed")
         except Exception as e:
-            print(f"  ✗ Auto-correction check failed: {e}")
+            print(f"  ✗ Correction handling failed: {e}")
 
         # Soul refinement: check if threshold met (5+ corrections across runs, 3+ days)
         try:
@@ -113,34 +265,10 @@ def run_full_update():
         except Exception as e:
             print(f"  ✗ Soul refinement failed: {e}")
 
-        print("  Generating analysis with Gemini...")
-        crypto_analysis, stock_analysis = generate_market_update(crypto_data, stock_data)
-
-        social_pulse = ""
-        try:
-            print("  Fetching X social pulse with Grok...")
-            social_pulse = get_x_social_pulse()
-        except Exception as e:
-            print(f"  ✗ X social pulse — {e}")
-
-        # Update BRAIN.md with live market state
-        print("  Updating BRAIN.md...")
-        brain_content = generate_brain_update(crypto_data, stock_data, crypto_analysis + "\n\n" + stock_analysis)
         write_brain(brain_content)
         print("  ✓ BRAIN.md updated")
 
-        # Message 1: Crypto
-        header = f"🗓 *Daily Market Update — {date_str}*\n{'─' * 34}\n\n"
-        crypto_msg = header + crypto_analysis
-        if social_pulse:
-            crypto_msg += "\n\n" + social_pulse
-        send_message(crypto_msg)
-
-        # Message 2: Stocks
-        if stock_analysis:
-            send_message(stock_analysis)
-
-        print("  ✓ Sent to Telegram")
+        save_payload_fingerprint(fingerprint)
 
     except Exception as e:
         print(f"  ✗ run_full_update failed: {e}")
@@ -184,50 +312,63 @@ _CHART_TRIGGERS = re.compile(
     re.IGNORECASE,
 )
 
+# One alternation for both symbol forms: $SYMBOL (group 1) or a bare known
+# ticker (group 2). Longest tickers first so e.g. GOOGL wins over GOOG-style
+# prefixes; the whole set compiles into the regex engine's state machine
+# instead of a Python-level membership test per word.
+_SYMBOL_RE = re.compile(
+    r"\$([A-Za-z]{2,6})|\b(" + "|".join(sorted(_BARE_TICKERS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
 # Timeframe patterns
 _TIMEFRAME_RE = re.compile(
     r"\b(1m|5m|15m|30m|1h|4h|1d|daily|hourly)\b",
     re.IGNORECASE,
 )
 
-_TIMEFRAME_MAP = {
+_BASE_TIMEFRAMES = {
     "1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m",
     "1h": "1h", "hourly": "1h",
     "4h": "4h",
     "1d": "1d", "daily": "1d",
 }
+# Case variants precomputed so lookups skip the per-message .lower() allocation
+# ("Daily"/"Hourly" still match because _TIMEFRAME_RE is case-insensitive)
+_TIMEFRAME_MAP = {
+    key: interval
+    for base_key, interval in _BASE_TIMEFRAMES.items()
+    for key in (base_key, base_key.upper(), base_key.capitalize())
+}
 
 
 def _detect_chart_request(text: str) -> dict | None:
     """Return {symbol, interval} if text looks like a price/chart query, else None."""
-    # Check for $SYMBOL
-    dollar_match = re.search(r"\$([A-Za-z]{2,6})", text)
-    bare_match = None
-
-    if not dollar_match:
-        # Check for bare known tickers
-        words = re.findall(r"\b([A-Za-z]{2,6})\b", text)
-        for w in words:
-            if w.upper() in _BARE_TICKERS:
-                bare_match = w.upper()
-                break
+    # Cheap gate: no $ and no trigger word means no chart intent — skip the scan
+    has_trigger = _CHART_TRIGGERS.search(text) is not None
+    if "$" not in text and not has_trigger:
+        return None
 
+    # One pass: prefer the first $SYMBOL; otherwise take the first bare ticker
     symbol = None
-    if dollar_match:
-        symbol = dollar_match.group(1).upper()
-    elif bare_match:
-        symbol = bare_match
+    dollar_match = False
+    for m in _SYMBOL_RE.finditer(text):
+        if m.group(1):
+            symbol, dollar_match = m.group(1).upper(), True
+            break
+        if symbol is None:
+            symbol = m.group(2).upper()
 
     if not symbol:
         return None
 
     # $ prefix alone is enough; otherwise need a trigger word
-    if not dollar_match and not _CHART_TRIGGERS.search(text):
+    if not dollar_match and not has_trigger:
         return None
 
     # Extract timeframe
     tf_match = _TIMEFRAME_RE.search(text)
-    interval = _TIMEFRAME_MAP.get(tf_match.group(1).lower(), "1h") if tf_match else "1h"
+    interval = _TIMEFRAME_MAP.get(tf_match.group(1), "1h") if tf_match else "1h"
 
     return {"symbol": symbol, "interval": interval}
 
@@ -262,86 +403,123 @@ def _handle_chart_request(chat_id: str, symbol: str, interval: str):
 # Message handling
 # ---------------------------------------------------------------------------
 
+_STREAM_EDIT_INTERVAL = 0.8  # seconds between in-place edits while streaming (Telegram rate-limits edits)
+
+
 def _handle_ask(chat_id: str, question: str):
-    """Answer a freeform question using agent context and persistent conversation history."""
+    """Answer a freeform question using agent context and persistent conversation history.
+
+    The answer is streamed into a placeholder message edited in place, so the
+    user sees first tokens at time-to-first-token instead of waiting for the
+    full generation.
+    """
     try:
         soul      = read_file("SOUL.md")
         brain     = read_file("BRAIN.md")
         learnings = read_file("LEARNINGS.md")
         history   = load_conversation(chat_id)
 
+        placeholder_id = send_placeholder(chat_id, "✍️ …")
+        last_edit = [0.0]
+
+        def _on_chunk(text: str) -> None:
+            now = time.monotonic()
+            if now - last_edit[0] < _STREAM_EDIT_INTERVAL:
+                return
+            last_edit[0] = now
+            edit_message(chat_id, placeholder_id, text + " ▌")
+
         save_message(chat_id, "user", question)
-        answer = answer_question(question, soul, brain, learnings, history)
+        answer = answer_question(question, soul, brain, learnings, history,
+                                 on_chunk=_on_chunk if placeholder_id else None)
         save_message(chat_id, "assistant", answer)
 
-        send_reply(chat_id, answer)
+        if placeholder_id is not None:
+            finalize_stream(chat_id, placeholder_id, answer)
+        else:
+            send_reply(chat_id, answer)
     except Exception as e:
         print(f"  ✗ _handle_ask error: {e}")
         send_reply(chat_id, "⚠️ Something went wrong. Try again.")
 
 
-def handle_message(chat_id: str, text: str):
-    """Route incoming Telegram message to the appropriate handler."""
-    text = text.strip()
-    cmd = text.lower()
+def _handle_help(chat_id: str, text: str):
+    reply = (
+        "🤖 *Market Agent Commands*\n\n"
+        "/update — Run full market update now\n"
+        "/brain — View current BRAIN.md state\n"
+        "/review — Trigger self-review now\n"
+        "/learnings — View active trading rules\n"
+        "/ask <question> — Ask the agent anything\n"
+        "/chart <SYMBOL> [interval] — Price chart (e.g. /chart HYPE 5m)\n\n"
+        "*Chart shortcuts:*\n"
+        "  `$BTC` `$SOL 4h` `$HYPE 5m` — send $SYMBOL to get a chart\n"
+        "  _Or ask: \"What is AAPL price?\", \"Show BTC 1h chart\"_\n\n"
+        "_Intervals: 1m 5m 15m 30m 1h 4h 1d (default: 1h)_"
+    )
+    send_reply(chat_id, reply)
 
-    if cmd == "/help":
-        reply = (
-            "🤖 *Market Agent Commands*\n\n"
-            "/update — Run full market update now\n"
-            "/brain — View current BRAIN.md state\n"
-            "/review — Trigger self-review now\n"
-            "/learnings — View active trading rules\n"
-            "/ask <question> — Ask the agent anything\n"
-            "/chart <SYMBOL> [interval] — Price chart (e.g. /chart HYPE 5m)\n\n"
-            "*Chart shortcuts:*\n"
-            "  `$BTC` `$SOL 4h` `$HYPE 5m` — send $SYMBOL to get a chart\n"
-            "  _Or ask: \"What is AAPL price?\", \"Show BTC 1h chart\"_\n\n"
-            "_Intervals: 1m 5m 15m 30m 1h 4h 1d (default: 1h)_"
-        )
-        send_reply(chat_id, reply)
 
-    elif cmd == "/update":
-        send_reply(chat_id, "⚙️ Running full update...")
-        run_full_update()
+def _handle_update(chat_id: str, text: str):
+    send_reply(chat_id, "⚙️ Running full update...")
+    run_full_update()
 
-    elif cmd == "/brain":
-        brain = read_file("BRAIN.md")
-        truncated = brain[:3500] + ("..." if len(brain) > 3500 else "")
-        send_reply(chat_id, truncated)
 
-    elif cmd == "/review":
-        send_reply(chat_id, "🔍 Running self-review...")
-        run_self_review()
+def _handle_brain(chat_id: str, text: str):
+    brain = read_file("BRAIN.md")
+    truncated = brain[:3500] + ("..." if len(brain) > 3500 else "")
+    send_reply(chat_id, truncated)
 
-    elif cmd == "/learnings":
-        learnings = read_file("LEARNINGS.md")
-        start = learnings.find("## Active Rules")
-        end = learnings.find("## Mistake Log")
-        if start != -1 and end != -1:
-            section = learnings[start:end].strip()
-        elif start != -1:
-            section = learnings[start:start + 3000].strip()
-        else:
-            section = learnings[:3000]
-        send_reply(chat_id, section)
+
+def _handle_review(chat_id: str, text: str):
+    send_reply(chat_id, "🔍 Running self-review...")
+    run_self_review()
+
+
+def _handle_learnings(chat_id: str, text: str):
+    learnings = read_file("LEARNINGS.md")
+    send_reply(chat_id, extract_active_rules(learnings, fallback_chars=3000))
+
+
+def _handle_chart_command(chat_id: str, text: str):
+    # /chart SYMBOL [interval]
+    parts = text.split()[1:]  # drop "/chart"
+    if not parts:
+        send_reply(chat_id, "Usage: /chart <SYMBOL> [interval]\nExample: /chart BTC 4h")
+        return
+    symbol = parts[0].lstrip("$").upper()
+    if not re.fullmatch(r"[A-Z0-9]{1,10}", symbol):
+        send_reply(chat_id, "❌ Invalid symbol. Use letters/numbers only, e.g. /chart BTC")
+        return
+    interval = _TIMEFRAME_MAP.get(parts[1], "1h") if len(parts) > 1 else "1h"
+    _handle_chart_request(chat_id, symbol, interval)
+
+
+# Exact commands — O(1) dispatch instead of walking an if/elif chain
+_COMMANDS = {
+    "/help":      _handle_help,
+    "/update":    _handle_update,
+    "/brain":     _handle_brain,
+    "/review":    _handle_review,
+    "/learnings": _handle_learnings,
+}
+
+
+def handle_message(chat_id: str, text: str):
+    """Route incoming Telegram message to the appropriate handler."""
+    text = text.strip()
+    cmd = text.lower()
+
+    handler = _COMMANDS.get(cmd)
+    if handler:
+        handler(chat_id, text)
 
     elif cmd.startswith("/ask "):
         question = text[5:].strip()
         _handle_ask(chat_id, question)
 
     elif cmd.startswith("/chart"):
-        # /chart SYMBOL [interval]
-        parts = text.split()[1:]  # drop "/chart"
-        if not parts:
-            send_reply(chat_id, "Usage: /chart <SYMBOL> [interval]\nExample: /chart BTC 4h")
-            return
-        symbol = parts[0].lstrip("$").upper()
-        if not re.fullmatch(r"[A-Z0-9]{1,10}", symbol):
-            send_reply(chat_id, "❌ Invalid symbol. Use letters/numbers only, e.g. /chart BTC")
-            return
-        interval = _TIMEFRAME_MAP.get(parts[1].lower(), "1h") if len(parts) > 1 else "1h"
-        _handle_chart_request(chat_id, symbol, interval)
+        _handle_chart_command(chat_id, text)
 
     else:
         # Chart detection — before freeform fallback
@@ -392,23 +570,54 @@ def polling_loop():
 # Scheduler thread
 # ---------------------------------------------------------------------------
 
+_shutdown = threading.Event()  # set to break the scheduler sleep immediately
+
+
+def _next_daily_fire(now: datetime) -> datetime:
+    """Next occurrence of UPDATE_TIME — today if still ahead, otherwise tomorrow."""
+    hour, minute = (int(part) for part in UPDATE_TIME.split(":"))
+    fire = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if fire <= now:
+        fire += timedelta(days=1)
+    return fire
+
+
 def _scheduler_thread():
-    """Run the schedule loop in a background daemon thread."""
-    schedule.every().day.at(UPDATE_TIME).do(run_full_update)
-    schedule.every(4).hours.do(run_self_review)
+    """Sleep until the next job is actually due, in a background daemon thread.
 
+    Computing the next fire time and sleeping exactly that long replaces the
+    old poll-every-30s loop (~2,880 wakeups/day to fire ~7 jobs). Event.wait
+    instead of time.sleep lets a shutdown signal break the sleep immediately.
+    """
     print(f"[Scheduler] Daily update at {UPDATE_TIME} | Self-review every 4h")
 
-    while True:
-        try:
-            schedule.run_pending()
-        except Exception as e:
-            print(f"[Scheduler] Job crashed: {e}")
+    next_review = datetime.now() + timedelta(hours=4)
+
+    while not _shutdown.is_set():
+        now = datetime.now()
+        next_daily = _next_daily_fire(now)
+        next_fire = min(next_daily, next_review)
+
+        if _shutdown.wait(timeout=max((next_fire - now).total_seconds(), 0)):
+            break
+
+        now = datetime.now()
+        due = []
+        if now >= next_review:
+            due.append(run_self_review)
+            next_review = now + timedelta(hours=4)
+        if now >= next_daily:
+            due.append(run_full_update)
+
+        for job in due:
             try:
-                send_message("⚠️ Scheduled job crashed. Check server logs.")
-            except Exception:
-                pass
-        time.sleep(30)
+                job()
+            except Exception as e:
+                print(f"[Scheduler] Job crashed: {e}")
+                try:
+                    send_message("⚠️ Scheduled job crashed. Check server logs.")
+                except Exception:
+                    pass
 
 
 # ---------------------------------------------------------------------------
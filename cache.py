@@ -0,0 +1,45 @@
+"""Tiny file-backed TTL cache for fetcher responses.
+
+Most external data moves far slower than we fetch it — funding rates
+reset every 8 hours, FRED Treasury yields update daily — so re-runs
+within the TTL can answer from a ~ms disk read instead of an HTTPS
+round trip. Entries live as JSON files under .cache/ shaped
+{"ts": ..., "value": ...}; a missing, stale, or corrupt file is simply
+a miss and the caller falls through to the network.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+_CACHE_DIR = Path(__file__).parent / ".cache"
+
+
+def make_key(url: str, params: dict | None = None) -> str:
+    """Stable cache key for an endpoint + params (order-insensitive)."""
+    blob = url + json.dumps(sorted((params or {}).items()), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def get(key: str, ttl_seconds: int):
+    """Return the cached value for key, or None if missing or older than TTL."""
+    try:
+        entry = json.loads((_CACHE_DIR / f"{key}.json").read_text())
+        if time.time() - entry["ts"] <= ttl_seconds:
+            return entry["value"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def set(key: str, value) -> None:
+    """Store value under key, swallowing disk errors — caching is best-effort."""
+    try:
+        _CACHE_DIR.mkdir(exist_ok=True)
+        path = _CACHE_DIR / f"{key}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"ts": time.time(), "value": value}, default=str))
+        os.replace(tmp, path)
+    except OSError:
+        pass
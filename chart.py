@@ -5,16 +5,25 @@ Data sources:
   - CoinGecko (fallback for non-Binance tokens like HYPE)
   - yfinance  (stocks)
 """
+import functools
+import hashlib
 import io
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from pathlib import Path
 
 import matplotlib
 matplotlib.use("Agg")  # headless / Windows — must be before any other matplotlib import
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import mplfinance as mpf
+import numpy as np
 import pandas as pd
-import requests
+from clients import HTTP, parse_json
 import yfinance as yf
 
 # ---------------------------------------------------------------------------
@@ -35,17 +44,6 @@ _COINGECKO_DAYS = {
     "1d":  90,
 }
 
-# Resample freq for CoinGecko ticks → OHLCV
-_RESAMPLE_FREQ = {
-    "1m":  "1min",
-    "5m":  "5min",
-    "15m": "15min",
-    "30m": "30min",
-    "1h":  "1h",
-    "4h":  "4h",
-    "1d":  "1D",
-}
-
 # yfinance (period, interval) pairs
 _YF_PARAMS = {
     "1m":  ("1d",  "1m"),
@@ -90,12 +88,53 @@ _COINGECKO_IDS = {
     "JTO":  "jito-governance-token",
 }
 
+# Candle width in seconds — drives the response-cache TTL per interval
+_INTERVAL_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "4h": 14400, "1d": 86400,
+}
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+_HTTP_CACHE: dict[tuple, object] = {}  # (url, params, time bucket) -> parsed JSON
+_HTTP_CACHE_MAX = 256
+
+
+def _cache_ttl(interval: str) -> int:
+    """TTL for cached responses: a quarter candle, capped at a minute."""
+    return min(60, _INTERVAL_SECONDS.get(interval, 3600) // 4)
+
+
+def _cached_get(url: str, params: dict, ttl: int, timeout: int = 10):
+    """GET returning parsed JSON, deduplicated within a TTL bucket.
+
+    Back-to-back requests for the same chart land in the same bucket and
+    reuse the parsed JSON instead of re-hitting the API. Only the decoded
+    body is stored, never the Response, so no sockets are pinned.
+    """
+    key = (url, tuple(sorted(params.items())), int(time.time() // ttl))
+    cached = _HTTP_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    resp = HTTP.get(url, params=params, timeout=timeout)
+    resp.raise_for_status()
+    data = parse_json(resp)
+
+    if len(_HTTP_CACHE) >= _HTTP_CACHE_MAX:
+        _HTTP_CACHE.clear()  # mostly expired buckets by this point — cheap reset
+    _HTTP_CACHE[key] = data
+    return data
+
+
 # ---------------------------------------------------------------------------
 # Chart style
 # ---------------------------------------------------------------------------
 
 def _make_style():
-    """TradingView-inspired dark style."""
+    """TradingView-inspired dark style. Built once at import — see _STYLE."""
     return mpf.make_mpf_style(
         base_mpf_style="nightclouds",
         marketcolors=mpf.make_marketcolors(
@@ -120,6 +159,12 @@ def _make_style():
     )
 
 
+_STYLE = _make_style()  # style dicts are immutable per render — build once
+
+_RENDER_LOCK = threading.Lock()  # matplotlib's pyplot state is not thread-safe
+_RENDER_BUF = io.BytesIO()       # reused across renders to avoid realloc churn
+
+
 # ---------------------------------------------------------------------------
 # Binance OHLCV
 # ---------------------------------------------------------------------------
@@ -131,21 +176,19 @@ def _fetch_binance(symbol: str, interval: str, limit: int = 100) -> pd.DataFrame
 
     url = "https://api.binance.com/api/v3/klines"
     params = {"symbol": f"{symbol.upper()}USDT", "interval": interval, "limit": limit}
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+    data = _cached_get(url, params, ttl=_cache_ttl(interval))
 
     if not data or isinstance(data, dict):
         raise ValueError(f"No Binance data for {symbol}")
 
-    df = pd.DataFrame(data, columns=[
-        "open_time", "Open", "High", "Low", "Close", "Volume",
-        "close_time", "quote_volume", "trades", "taker_buy_base",
-        "taker_buy_quote", "ignore",
-    ])
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms", utc=True)
-    df = df.set_index("open_time")
-    df = df[["Open", "High", "Low", "Close", "Volume"]].astype(float)
+    # Parse straight into one float64 buffer — building the full 12-column
+    # frame just to slice 5 columns and cast paid for 7 throwaway columns
+    # plus per-column dtype inference
+    arr = np.array(data, dtype=object)
+    ohlcv = arr[:, 1:6].astype(np.float64)
+    idx = pd.to_datetime(arr[:, 0].astype(np.int64), unit="ms", utc=True)
+    df = pd.DataFrame(ohlcv, index=idx,
+                      columns=["Open", "High", "Low", "Close", "Volume"])
     df.index.name = "Date"
     return df
 
@@ -154,54 +197,116 @@ def _fetch_binance(symbol: str, interval: str, limit: int = 100) -> pd.DataFrame
 # CoinGecko OHLCV
 # ---------------------------------------------------------------------------
 
+_ID_CACHE_FILE = Path(__file__).parent / "coin_ids.json"
+_ID_NEGATIVE_TTL = 86400  # re-probe symbols that resolved to nothing once a day
+_ID_CACHE: dict | None = None  # symbol -> {"id": str | None, "ts": float}
+
+
+def _load_id_cache() -> dict:
+    global _ID_CACHE
+    if _ID_CACHE is None:
+        try:
+            _ID_CACHE = json.loads(_ID_CACHE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            _ID_CACHE = {}
+    return _ID_CACHE
+
+
+def _persist_id_cache() -> None:
+    try:
+        _ID_CACHE_FILE.write_text(json.dumps(_ID_CACHE, indent=2), encoding="utf-8")
+    except Exception:
+        pass  # cache is an optimization — never fail a chart over it
+
+
 def _coingecko_id(symbol: str) -> str:
-    """Return CoinGecko coin ID for a ticker symbol. Raises if not found."""
-    sym = symbol.upper()
+    """Return CoinGecko coin ID for a ticker symbol. Raises if not found.
+
+    Successful lookups memoize in-process (lru_cache on the resolver), and
+    resolutions including misses persist to coin_ids.json with a daily TTL,
+    so each unknown symbol costs the /search round trip at most once a day.
+    """
+    return _resolve_coingecko_id(symbol.upper().strip())
+
+
+@functools.lru_cache(maxsize=512)
+def _resolve_coingecko_id(sym: str) -> str:
     if sym in _COINGECKO_IDS:
         return _COINGECKO_IDS[sym]
 
+    cache = _load_id_cache()
+    entry = cache.get(sym)
+    if entry is not None:
+        if entry.get("id"):
+            return entry["id"]
+        if time.time() - entry.get("ts", 0) < _ID_NEGATIVE_TTL:
+            raise ValueError(f"CoinGecko: no coin found for {sym}")
+
     # Try search endpoint
     url = "https://api.coingecko.com/api/v3/search"
-    resp = requests.get(url, params={"query": symbol}, timeout=10)
+    resp = HTTP.get(url, params={"query": sym}, timeout=10)
     resp.raise_for_status()
-    coins = resp.json().get("coins", [])
-    if not coins:
-        raise ValueError(f"CoinGecko: no coin found for {symbol}")
+    coins = parse_json(resp).get("coins", [])
 
     # Prefer exact symbol match
+    coin_id = None
     for coin in coins:
         if coin.get("symbol", "").upper() == sym:
-            return coin["id"]
-    return coins[0]["id"]
+            coin_id = coin["id"]
+            break
+    if coin_id is None and coins:
+        coin_id = coins[0]["id"]
+
+    cache[sym] = {"id": coin_id, "ts": time.time()}
+    _persist_id_cache()
+
+    if coin_id is None:
+        raise ValueError(f"CoinGecko: no coin found for {sym}")
+    return coin_id
 
 
 def _fetch_coingecko(symbol: str, interval: str) -> pd.DataFrame:
     """Fetch price ticks from CoinGecko and resample to OHLCV. Raises on failure."""
     coin_id = _coingecko_id(symbol)
     days = _COINGECKO_DAYS.get(interval, 7)
-    freq = _RESAMPLE_FREQ.get(interval, "1h")
+    freq_ms = _INTERVAL_SECONDS.get(interval, 3600) * 1000
 
     url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
     params = {"vs_currency": "usd", "days": days}
-    resp = requests.get(url, params=params, timeout=15)
-    resp.raise_for_status()
-    prices = resp.json().get("prices", [])
+    prices = _cached_get(url, params, ttl=_cache_ttl(interval), timeout=15).get("prices", [])
 
     if not prices:
         raise ValueError(f"CoinGecko: no price data for {symbol}")
 
-    ts = pd.DataFrame(prices, columns=["timestamp", "price"])
-    ts["timestamp"] = pd.to_datetime(ts["timestamp"], unit="ms", utc=True)
-    ts = ts.set_index("timestamp")
-
-    # Resample ticks → OHLCV
-    ohlcv = ts["price"].resample(freq).agg(
-        Open="first", High="max", Low="min", Close="last"
-    ).dropna()
-
-    # Synthetic volume (proportional to price range)
-    ohlcv["Volume"] = (ohlcv["High"] - ohlcv["Low"]) / ohlcv["Close"] * 1_000_000
-
+    # Bucketed reduction instead of resample().agg() — floor timestamps into
+    # candle ids, then reduceat over each bucket's run. Same bars, no groupby
+    # machinery, and empty buckets never exist so there's nothing to dropna.
+    raw = np.asarray(prices, dtype=np.float64)
+    ts_ms = raw[:, 0]
+    px    = raw[:, 1]
+
+    order = np.argsort(ts_ms, kind="stable")  # ticks arrive sorted, but reduceat requires it
+    ts_ms, px = ts_ms[order], px[order]
+
+    bucket = (ts_ms // freq_ms).astype(np.int64)
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+
+    opens  = px[starts]
+    highs  = np.maximum.reduceat(px, starts)
+    lows   = np.minimum.reduceat(px, starts)
+    closes = px[np.append(starts[1:] - 1, len(px) - 1)]
+
+    ohlcv = pd.DataFrame(
+        {
+            "Open":  opens,
+            "High":  highs,
+            "Low":   lows,
+            "Close": closes,
+            # Synthetic volume (proportional to price range)
+            "Volume": (highs - lows) / closes * 1_000_000,
+        },
+        index=pd.to_datetime(bucket[starts] * freq_ms, unit="ms", utc=True),
+    )
     ohlcv.index.name = "Date"
     return ohlcv
 
@@ -221,7 +326,9 @@ def _fetch_yfinance(ticker: str, interval: str) -> pd.DataFrame:
     if df.empty:
         raise ValueError(f"yfinance: no data for {ticker}")
 
-    df = df[["Open", "High", "Low", "Close", "Volume"]].copy()
+    # No .copy() — columns are never mutated below, and rebinding df.index
+    # is safe on the selection, so the full-frame duplicate was pure cost
+    df = df[["Open", "High", "Low", "Close", "Volume"]]
 
     # Strip timezone so mplfinance doesn't complain
     if hasattr(df.index, "tz") and df.index.tz is not None:
@@ -240,9 +347,28 @@ def _fetch_yfinance(ticker: str, interval: str) -> pd.DataFrame:
 # Chart rendering
 # ---------------------------------------------------------------------------
 
+_PNG_CACHE: OrderedDict[bytes, bytes] = OrderedDict()  # content hash -> PNG bytes
+_PNG_CACHE_MAX = 128
+
+
 def _build_chart(df: pd.DataFrame, title: str, current_price: float) -> bytes:
-    """Render a TradingView-style candlestick chart. Returns PNG bytes."""
-    style = _make_style()
+    """Render a TradingView-style candlestick chart. Returns PNG bytes.
+
+    Renders are content-addressed: identical bars + title + price hash to the
+    same key, so re-requesting a chart within the same candle is a dict
+    lookup instead of a few hundred ms of matplotlib.
+    """
+    key = hashlib.blake2b(
+        df.to_numpy().tobytes()
+        + df.index.asi8.tobytes()
+        + title.encode()
+        + struct.pack("<d", round(current_price, 6)),
+        digest_size=16,
+    ).digest()
+    cached = _PNG_CACHE.get(key)
+    if cached is not None:
+        _PNG_CACHE.move_to_end(key)
+        return cached
 
     # Adaptive MAs — skip if not enough rows
     mav = []
@@ -251,35 +377,37 @@ def _build_chart(df: pd.DataFrame, title: str, current_price: float) -> bytes:
     elif len(df) >= 20:
         mav = [20]
 
-    # Current price dashed line (must be a Series with same index as df)
-    price_line = pd.Series([current_price] * len(df), index=df.index)
-    ap = [mpf.make_addplot(
-        price_line,
-        color="#ffd700",
-        linestyle="--",
-        width=1.0,
-        secondary_y=False,
-    )]
-
-    fig, axes = mpf.plot(
-        df,
-        type="candle",
-        style=style,
-        title=f"  {title}",
-        volume=True,
-        mav=mav if mav else None,
-        addplot=ap,
-        figsize=(12, 7),
-        returnfig=True,
-        tight_layout=True,
-    )
-
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=120, bbox_inches="tight",
-                facecolor=fig.get_facecolor())
-    plt.close("all")
-    buf.seek(0)
-    return buf.read()
+    with _RENDER_LOCK:
+        fig, axes = mpf.plot(
+            df,
+            type="candle",
+            style=_STYLE,
+            title=f"  {title}",
+            volume=True,
+            mav=mav if mav else None,
+            # Current price as a true horizontal-line primitive — one Line2D
+            # instead of an N-point constant Series drawn segment by segment
+            hlines=dict(hlines=[current_price], colors=["#ffd700"],
+                        linestyle="--", linewidths=1.0),
+            figsize=(10, 6),
+            returnfig=True,
+            tight_layout=True,
+        )
+
+        _RENDER_BUF.seek(0)
+        _RENDER_BUF.truncate()
+        # Telegram downscales to <=1280px, so 96 dpi is visually identical;
+        # skipping bbox_inches="tight" avoids the extra measuring draw pass
+        fig.savefig(_RENDER_BUF, format="png", dpi=96,
+                    pil_kwargs={"optimize": True, "compress_level": 6},
+                    facecolor=fig.get_facecolor())
+        plt.close(fig)
+        png = _RENDER_BUF.getvalue()
+
+    _PNG_CACHE[key] = png
+    if len(_PNG_CACHE) > _PNG_CACHE_MAX:
+        _PNG_CACHE.popitem(last=False)
+    return png
 
 
 def _format_caption(symbol: str, current_price: float, prev_price: float, interval: str) -> str:
@@ -288,12 +416,12 @@ def _format_caption(symbol: str, current_price: float, prev_price: float, interv
     arrow = "▲" if change_pct >= 0 else "▼"
     sign = "+" if change_pct >= 0 else ""
 
-    if current_price >= 1000:
-        price_str = f"${current_price:,.2f}"
-    elif current_price >= 1:
-        price_str = f"${current_price:.4f}".rstrip("0").rstrip(".")
-    else:
-        price_str = f"${current_price:.6f}".rstrip("0").rstrip(".")
+    # One parameterized format instead of three branches; only the sub-$1000
+    # precisions ever need trailing zeros stripped
+    prec = 2 if current_price >= 1000 else (4 if current_price >= 1 else 6)
+    price_str = f"${current_price:,.{prec}f}"
+    if prec != 2:
+        price_str = price_str.rstrip("0").rstrip(".")
 
     return f"*{symbol.upper()}* — {price_str}  {arrow} {sign}{change_pct:.2f}% ({interval} chart)"
 
@@ -335,6 +463,39 @@ def get_crypto_chart(symbol: str, interval: str = "1h") -> tuple[bytes, str]:
     return png, caption
 
 
+def get_crypto_chart_data(symbol: str, interval: str = "1h") -> dict:
+    """Fetch crypto OHLCV and return it as plain data, skipping the render.
+
+    For consumers that draw client-side, the ~6 KB bar array replaces a
+    ~100 KB matplotlib PNG and the render CPU that produced it. Telegram
+    delivery keeps using get_crypto_chart.
+    """
+    interval = interval.lower()
+    df = None
+    errors = []
+
+    try:
+        df = _fetch_binance(symbol, interval)
+    except Exception as e:
+        errors.append(f"Binance: {e}")
+
+    if df is None:
+        try:
+            df = _fetch_coingecko(symbol, interval)
+        except Exception as e:
+            errors.append(f"CoinGecko: {e}")
+
+    if df is None or df.empty:
+        raise ValueError(f"No crypto data for {symbol}: {'; '.join(errors)}")
+
+    return {
+        "symbol":   symbol.upper(),
+        "interval": interval,
+        "current":  float(df["Close"].iloc[-1]),
+        "ohlcv":    df.reset_index().values.tolist(),
+    }
+
+
 def get_stock_chart(ticker: str, interval: str = "1h") -> tuple[bytes, str]:
     """Fetch stock OHLCV from yfinance and return (png_bytes, caption)."""
     interval = interval.lower()
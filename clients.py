@@ -0,0 +1,46 @@
+"""Shared HTTP transport — one pooled session for all outbound API calls.
+
+Every fetcher used to call requests.get directly, paying a fresh TCP+TLS
+handshake per request. A single module-level Session keeps warm keepalive
+connections per host and retries transient failures with a short backoff,
+so concurrent fan-outs reuse sockets instead of racing to open new ones.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HTTP = requests.Session()
+HTTP.headers.update({
+    "User-Agent": "stock-crypto-agent/1.0",
+    "Accept":     "application/json",
+})
+
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),  # never replay a non-idempotent send
+        respect_retry_after_header=True,
+    ),
+)
+HTTP.mount("https://", _adapter)
+HTTP.mount("http://", _adapter)
+
+
+def parse_json(resp: requests.Response):
+    """Decode a response body, preferring orjson's C parser when installed.
+
+    The big DeFiLlama and Deribit payloads (hundreds of KB) parse several
+    times faster through orjson than stdlib json.
+    """
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
@@ -2,7 +2,10 @@
 FRED API key is used for yield curve in macro.py; FF provides the forward-looking calendar.
 """
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from clients import HTTP, parse_json
 from datetime import datetime, date
 
 FF_THIS_WEEK = "https://nfs.faireconomy.media/ff_calendar_thisweek.json"
@@ -55,10 +58,31 @@ def _parse_ff_event(raw: str) -> tuple[date | None, str | None, str | None]:
     return None, None, None
 
 
+# url -> (etag, last_modified, parsed body) — FF updates a few times a day,
+# so most refetches come back as a ~0-byte 304 instead of the full blob
+_FF_CACHE: dict[str, tuple[str, str, list]] = {}
+
+
 def _fetch_ff(url: str) -> list[dict]:
-    resp = requests.get(url, timeout=10)
+    cached = _FF_CACHE.get(url)
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    resp = HTTP.get(url, headers=headers, timeout=10)
+    if resp.status_code == 304 and cached:
+        return cached[2]
     resp.raise_for_status()
-    return resp.json()
+
+    data = parse_json(resp)
+    _FF_CACHE[url] = (resp.headers.get("ETag", ""),
+                      resp.headers.get("Last-Modified", ""),
+                      data)
+    return data
 
 
 def get_upcoming_events() -> list[dict]:
@@ -69,20 +93,29 @@ def get_upcoming_events() -> list[dict]:
     today = datetime.now().date()
     raw   = []
 
-    for url in (FF_THIS_WEEK, FF_NEXT_WEEK):
-        try:
-            raw.extend(_fetch_ff(url))
-        except Exception:
-            pass
+    # The two week files are independent — fetch them in parallel
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for fut in [pool.submit(_fetch_ff, url) for url in (FF_THIS_WEEK, FF_NEXT_WEEK)]:
+            try:
+                raw.extend(fut.result())
+            except Exception:
+                pass
 
-    events = []
-    for ev in raw:
-        if ev.get("country") != _WANTED_COUNTRY:
-            continue
-        if ev.get("impact") not in _WANTED_IMPACT:
-            continue
+    if not raw:
+        return []
+
+    df = pd.DataFrame(raw)
+    if not {"country", "impact", "date", "title"}.issubset(df.columns):
+        return []
 
-        ev_date, ev_time, ev_tz = _parse_ff_event(ev.get("date", ""))
+    # Vectorized filter + raw-level dedupe up front — only the few dozen
+    # survivors of ~400 rows pay the per-event datetime parse below
+    df = df[df["country"].eq(_WANTED_COUNTRY) & df["impact"].isin(_WANTED_IMPACT)]
+    df = df.drop_duplicates(subset=["date", "title"])
+
+    events = []
+    for ev in df.to_dict("records"):
+        ev_date, ev_time, ev_tz = _parse_ff_event(str(ev.get("date", "")))
         if ev_date is None or ev_date < today:
             continue
 
@@ -1,5 +1,5 @@
 import json
-import requests
+from clients import HTTP, parse_json
 from datetime import datetime
 from pathlib import Path
 
@@ -59,9 +59,9 @@ def get_watchlist_data() -> list:
         "sparkline": False,
         "price_change_percentage": "24h,7d",
     }
-    response = requests.get(url, params=params, headers=HEADERS, timeout=15)
+    response = HTTP.get(url, params=params, headers=HEADERS, timeout=15)
     response.raise_for_status()
-    raw = response.json()
+    raw = parse_json(response)
 
     result = []
     for coin in raw:
@@ -83,9 +83,9 @@ def get_watchlist_data() -> list:
 def get_trending_coins() -> list:
     """Fetch the top trending coins on CoinGecko right now."""
     url = f"{COINGECKO_BASE}/search/trending"
-    response = requests.get(url, headers=HEADERS, timeout=15)
+    response = HTTP.get(url, headers=HEADERS, timeout=15)
     response.raise_for_status()
-    coins = response.json().get("coins", [])[:7]
+    coins = parse_json(response).get("coins", [])[:7]
 
     result = []
     for item in coins:
@@ -102,9 +102,9 @@ def get_trending_coins() -> list:
 def get_global_market() -> dict:
     """Fetch global crypto market statistics."""
     url = f"{COINGECKO_BASE}/global"
-    response = requests.get(url, headers=HEADERS, timeout=15)
+    response = HTTP.get(url, headers=HEADERS, timeout=15)
     response.raise_for_status()
-    data = response.json().get("data", {})
+    data = parse_json(response).get("data", {})
 
     return {
         "total_market_cap_usd": data.get("total_market_cap", {}).get("usd"),
@@ -120,9 +120,9 @@ def get_top_categories() -> list:
     """Fetch crypto categories ranked by 24h market cap change, enriched with lifecycle phase."""
     url = f"{COINGECKO_BASE}/coins/categories"
     params = {"order": "market_cap_change_24h_desc"}
-    response = requests.get(url, params=params, headers=HEADERS, timeout=15)
+    response = HTTP.get(url, params=params, headers=HEADERS, timeout=15)
     response.raise_for_status()
-    data = response.json()
+    data = parse_json(response)
 
     history = _load_history()
     today   = datetime.now().strftime("%Y-%m-%d")
@@ -1,7 +1,10 @@
 """DeFiLlama — protocol TVL, chain activity, stablecoin supply.
 All endpoints are public and require no API keys.
 """
-import requests
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from clients import HTTP, parse_json
 
 LLAMA_BASE   = "https://api.llama.fi"
 STABLE_BASE  = "https://stablecoins.llama.fi"
@@ -9,16 +12,20 @@ STABLE_BASE  = "https://stablecoins.llama.fi"
 
 def get_protocol_tvl() -> list[dict]:
     """Top 20 DeFi protocols by TVL with 1d/7d change (>$100M TVL only)."""
-    resp = requests.get(f"{LLAMA_BASE}/protocols", timeout=20)
+    resp = HTTP.get(f"{LLAMA_BASE}/protocols", timeout=20)
     resp.raise_for_status()
 
+    # Partial sort: top 20 of ~3000 protocols is O(N log K), not a full sort,
+    # and the TVL floor shrinks the candidate pool before the heap sees it
+    top = heapq.nlargest(
+        20,
+        (p for p in parse_json(resp) if (p.get("tvl") or 0) >= 100_000_000),
+        key=lambda x: x["tvl"],
+    )
+
     result = []
-    for p in sorted(resp.json(), key=lambda x: x.get("tvl") or 0, reverse=True):
+    for p in top:
         tvl = p.get("tvl") or 0
-        if tvl < 100_000_000:
-            break
-        if len(result) >= 20:
-            break
         result.append({
             "name":          p.get("name"),
             "category":      p.get("category"),
@@ -32,11 +39,11 @@ def get_protocol_tvl() -> list[dict]:
 
 def get_chain_tvl() -> list[dict]:
     """Top 10 blockchains by TVL with 1d/7d change."""
-    resp = requests.get(f"{LLAMA_BASE}/v2/chains", timeout=15)
+    resp = HTTP.get(f"{LLAMA_BASE}/v2/chains", timeout=15)
     resp.raise_for_status()
 
     result = []
-    for c in sorted(resp.json(), key=lambda x: x.get("tvl") or 0, reverse=True)[:10]:
+    for c in heapq.nlargest(10, parse_json(resp), key=lambda x: x.get("tvl") or 0):
         tvl = c.get("tvl") or 0
         if tvl < 100_000_000:
             continue
@@ -51,13 +58,13 @@ def get_chain_tvl() -> list[dict]:
 
 def get_stablecoin_supply() -> dict:
     """Total stablecoin market cap + top 5 by size. Rising supply = capital entering crypto."""
-    resp = requests.get(f"{STABLE_BASE}/stablecoins?includePrices=true", timeout=15)
+    resp = HTTP.get(f"{STABLE_BASE}/stablecoins?includePrices=true", timeout=15)
     resp.raise_for_status()
-    assets = resp.json().get("peggedAssets", [])
+    assets = parse_json(resp).get("peggedAssets", [])
 
     total = 0.0
     top   = []
-    for s in sorted(assets, key=lambda x: (x.get("circulating") or {}).get("peggedUSD") or 0, reverse=True)[:5]:
+    for s in heapq.nlargest(5, assets, key=lambda x: (x.get("circulating") or {}).get("peggedUSD") or 0):
         circ = (s.get("circulating") or {}).get("peggedUSD") or 0
         total += circ
         top.append({
@@ -69,3 +76,25 @@ def get_stablecoin_supply() -> dict:
         "total_stablecoin_mcap_usd": round(total),
         "top_stablecoins":           top,
     }
+
+
+def get_defillama_bundle() -> dict:
+    """Fetch protocols, chains, and stablecoins with their round trips overlapped.
+
+    The three endpoints are independent, so the bundle costs one max RTT
+    instead of three serial ones. A failed leg comes back as its empty
+    default rather than sinking the whole bundle.
+    """
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = {
+            "protocols":   (pool.submit(get_protocol_tvl), []),
+            "chains":      (pool.submit(get_chain_tvl), []),
+            "stablecoins": (pool.submit(get_stablecoin_supply), {}),
+        }
+        bundle = {}
+        for key, (fut, default) in futures.items():
+            try:
+                bundle[key] = fut.result()
+            except Exception:
+                bundle[key] = default
+        return bundle
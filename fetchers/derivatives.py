@@ -1,7 +1,12 @@
 """Crypto derivatives data — Binance Futures + Deribit options.
 All endpoints are public and require no API keys.
 """
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import cache
+from clients import HTTP as _SESSION, parse_json
 
 BINANCE_FUTURES = "https://fapi.binance.com/fapi/v1"
 BINANCE_SPOT    = "https://api.binance.com/api/v3"
@@ -10,38 +15,37 @@ DERIBIT         = "https://www.deribit.com/api/v2/public"
 SYMBOLS = ["BTC", "ETH"]
 
 
-def _funding_rate(symbol: str) -> float | None:
-    resp = requests.get(
-        f"{BINANCE_FUTURES}/fundingRate",
-        params={"symbol": f"{symbol}USDT", "limit": 1},
-        timeout=10,
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    if data:
-        return round(float(data[-1].get("fundingRate", 0)) * 100, 4)
-    return None
+def _premium_index_batch() -> dict:
+    """Funding rate + mark price for every perp in one GET, keyed by pair.
 
+    /premiumIndex without a symbol returns the full array — one round trip
+    replaces the separate fundingRate and futures ticker calls per symbol.
+    Cached for 60s — mark price feeds basis, which goes stale fast.
+    """
+    key = cache.make_key(f"{BINANCE_FUTURES}/premiumIndex")
+    hit = cache.get(key, ttl_seconds=60)
+    if hit is not None:
+        return hit
 
-def _open_interest(symbol: str) -> float | None:
-    resp = requests.get(
-        f"{BINANCE_FUTURES}/openInterest",
-        params={"symbol": f"{symbol}USDT"},
-        timeout=10,
-    )
+    resp = _SESSION.get(f"{BINANCE_FUTURES}/premiumIndex", timeout=10)
     resp.raise_for_status()
-    return float(resp.json().get("openInterest", 0))
+    data = {row.get("symbol"): row for row in parse_json(resp)}
+    cache.set(key, data)
+    return data
+
 
+def _open_interest(symbol: str) -> float | None:
+    params = {"symbol": f"{symbol}USDT"}
+    key = cache.make_key(f"{BINANCE_FUTURES}/openInterest", params)
+    hit = cache.get(key, ttl_seconds=300)
+    if hit is not None:
+        return hit
 
-def _basis(symbol: str) -> float | None:
-    """Basis = (futures mark price - spot price) / spot price * 100."""
-    spot_r = requests.get(f"{BINANCE_SPOT}/ticker/price",    params={"symbol": f"{symbol}USDT"}, timeout=10)
-    fut_r  = requests.get(f"{BINANCE_FUTURES}/ticker/price", params={"symbol": f"{symbol}USDT"}, timeout=10)
-    spot_r.raise_for_status()
-    fut_r.raise_for_status()
-    spot = float(spot_r.json()["price"])
-    fut  = float(fut_r.json()["price"])
-    return round((fut - spot) / spot * 100, 4)
+    resp = _SESSION.get(f"{BINANCE_FUTURES}/openInterest", params=params, timeout=10)
+    resp.raise_for_status()
+    oi = float(parse_json(resp).get("openInterest", 0))
+    cache.set(key, oi)
+    return oi
 
 
 def _taker_volume(symbol: str) -> dict:
@@ -50,16 +54,19 @@ def _taker_volume(symbol: str) -> dict:
     taker_buy_ratio < 0.45 = aggressive sellers dominating (bearish pressure)
     Kline fields: [0]=open_time [7]=quote_volume [10]=taker_buy_quote_volume
     """
-    resp = requests.get(
+    resp = _SESSION.get(
         f"{BINANCE_FUTURES}/klines",
         params={"symbol": f"{symbol}USDT", "interval": "1h", "limit": 24},
         timeout=10,
     )
     resp.raise_for_status()
-    candles = resp.json()
+    candles = parse_json(resp)
+    if not candles:
+        return {}
 
-    total_vol  = sum(float(c[7])  for c in candles)
-    taker_buy  = sum(float(c[10]) for c in candles)
+    # Two column sums in C instead of 2N Python float() conversions
+    cols = np.asarray(candles, dtype=object)[:, [7, 10]].astype(np.float64)
+    total_vol, taker_buy = cols.sum(axis=0)
 
     if total_vol == 0:
         return {}
@@ -72,52 +79,65 @@ def _taker_volume(symbol: str) -> dict:
     }
 
 
-def _btc_options_analysis() -> dict:
+def _btc_options_analysis(premium_fut=None) -> dict:
     """Enhanced BTC options from Deribit:
     - put/call OI ratio
     - OI distribution: ATM (±5%), OTM calls (5-20% above), OTM puts (5-20% below)
-    """
-    # Get spot price for zone classification
-    spot_r = requests.get(f"{BINANCE_SPOT}/ticker/price", params={"symbol": "BTCUSDT"}, timeout=10)
-    spot_r.raise_for_status()
-    spot = float(spot_r.json()["price"])
 
-    resp = requests.get(
+    premium_fut is the in-flight /premiumIndex future from the caller; its
+    BTC index price doubles as the spot for zone classification, so no
+    separate spot GET is needed. Resolved only after the (much slower)
+    Deribit call returns, keeping the two requests overlapped.
+    """
+    resp = _SESSION.get(
         f"{DERIBIT}/get_book_summary_by_currency",
         params={"currency": "BTC", "kind": "option"},
         timeout=20,
     )
     resp.raise_for_status()
-    instruments = resp.json().get("result", [])
-
-    put_oi = call_oi = atm_oi = otm_call_oi = otm_put_oi = 0.0
+    instruments = parse_json(resp).get("result", [])
 
+    spot = None
+    if premium_fut is not None:
+        try:
+            row = premium_fut.result().get("BTCUSDT") or {}
+            spot = float(row["indexPrice"])
+        except Exception:
+            spot = None
+    if spot is None:
+        # Fallback: fetch spot directly if the batch failed
+        spot_r = _SESSION.get(f"{BINANCE_SPOT}/ticker/price", params={"symbol": "BTCUSDT"}, timeout=10)
+        spot_r.raise_for_status()
+        spot = float(parse_json(spot_r)["price"])
+
+    # One pass extracts (strike, oi, is_call); put/call totals and zone
+    # sums are then boolean-mask reductions instead of ~1000 Python
+    # iterations of split/float/branch per metric
+    rows = []
     for inst in instruments:
-        name = inst.get("instrument_name", "")
-        oi   = inst.get("open_interest") or 0
-        parts = name.split("-")
+        parts = inst.get("instrument_name", "").split("-")
         if len(parts) < 4:
             continue
         try:
             strike = float(parts[2])
         except ValueError:
             continue
+        rows.append((strike, inst.get("open_interest") or 0.0, parts[3] == "C"))
 
-        is_call = name.endswith("-C")
-        is_put  = name.endswith("-P")
+    put_oi = call_oi = atm_oi = otm_call_oi = otm_put_oi = 0.0
+    if rows:
+        n = len(rows)
+        strikes = np.fromiter((r[0] for r in rows), dtype=np.float64, count=n)
+        ois     = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+        is_call = np.fromiter((r[2] for r in rows), dtype=bool, count=n)
 
-        if is_call:
-            call_oi += oi
-        elif is_put:
-            put_oi += oi
+        put_oi  = float(ois[~is_call].sum())
+        call_oi = float(ois[is_call].sum())
 
-        pct = (strike - spot) / spot * 100
-        if abs(pct) <= 5:
-            atm_oi += oi
-        elif 5 < pct <= 20:
-            otm_call_oi += oi
-        elif -20 <= pct < -5:
-            otm_put_oi += oi
+        pct = (strikes - spot) / spot * 100
+        atm_oi      = float(ois[np.abs(pct) <= 5].sum())
+        otm_call_oi = float(ois[(pct > 5) & (pct <= 20)].sum())
+        otm_put_oi  = float(ois[(pct >= -20) & (pct < -5)].sum())
 
     return {
         "spot_price":    round(spot),
@@ -129,38 +149,55 @@ def _btc_options_analysis() -> dict:
 
 
 def get_crypto_derivatives() -> dict:
-    """Return funding rates, OI, basis, liquidations for BTC+ETH and BTC options analysis."""
-    result = {}
-
-    for sym in SYMBOLS:
-        data = {}
-
-        try:
-            data["funding_rate_pct"] = _funding_rate(sym)
-        except Exception:
-            data["funding_rate_pct"] = None
+    """Return funding rates, OI, basis, liquidations for BTC+ETH and BTC options analysis.
+
+    Funding and basis for all symbols come from one batched /premiumIndex
+    GET — markPrice vs indexPrice gives the basis without a separate spot
+    call. Only open interest and taker volume still need a call per symbol.
+    Everything fans out on a thread pool so wall time is ~max(latency), and
+    any metric that fails comes back as None, same as the old per-call
+    try/except.
+    """
+    result = {sym: {} for sym in SYMBOLS}
 
-        try:
-            data["open_interest"] = _open_interest(sym)
-        except Exception:
-            data["open_interest"] = None
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        fut_premium = executor.submit(_premium_index_batch)
+        fut_oi      = {sym: executor.submit(_open_interest, sym) for sym in SYMBOLS}
+        fut_taker   = {sym: executor.submit(_taker_volume, sym) for sym in SYMBOLS}
+        # BTC enhanced options analysis from Deribit, sharing the premium
+        # batch's index price as its spot reference
+        fut_options = executor.submit(_btc_options_analysis, fut_premium)
 
         try:
-            data["basis_pct"] = _basis(sym)
+            premium = fut_premium.result()
         except Exception:
-            data["basis_pct"] = None
+            premium = {}
+
+        for sym in SYMBOLS:
+            row = premium.get(f"{sym}USDT") or {}
+
+            try:
+                result[sym]["funding_rate_pct"] = round(float(row["lastFundingRate"]) * 100, 4)
+            except (KeyError, TypeError, ValueError):
+                result[sym]["funding_rate_pct"] = None
+
+            try:
+                # Basis = (mark price - index price) / index price * 100;
+                # both ship in the same premiumIndex row
+                index = float(row["indexPrice"])
+                result[sym]["basis_pct"] = round((float(row["markPrice"]) - index) / index * 100, 4)
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                result[sym]["basis_pct"] = None
+
+            for metric, fut in (("open_interest", fut_oi[sym]), ("taker_volume", fut_taker[sym])):
+                try:
+                    result[sym][metric] = fut.result()
+                except Exception:
+                    result[sym][metric] = None
 
         try:
-            data["taker_volume"] = _taker_volume(sym)
+            result["BTC"]["options"] = fut_options.result()
         except Exception:
-            data["taker_volume"] = None
-
-        result[sym] = data
-
-    # BTC enhanced options analysis from Deribit
-    try:
-        result["BTC"]["options"] = _btc_options_analysis()
-    except Exception:
-        result["BTC"]["options"] = None
+            result["BTC"]["options"] = None
 
     return result
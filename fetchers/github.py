@@ -1,8 +1,12 @@
 """GitHub developer activity — auto-selected based on trending narrative names.
 Uses public API (60 req/hr unauthenticated). Set GITHUB_TOKEN in .env for 5000/hr.
 """
+import functools
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cache
+from clients import HTTP, parse_json
 from datetime import datetime, timedelta, timezone
 
 GITHUB_API = "https://api.github.com"
@@ -78,28 +82,47 @@ _NARRATIVE_KEYWORDS: dict[str, list[str]] = {
 # Always include these regardless of narratives
 _BASE_REPOS = ["ethereum/go-ethereum", "solana-labs/solana"]
 
+# Flattened at import time so matching never re-resolves protocol keys
+_KEYWORD_TO_REPOS: dict[str, tuple[str, ...]] = {
+    kw: tuple(PROTOCOL_REPOS[p] for p in protos if p in PROTOCOL_REPOS)
+    for kw, protos in _NARRATIVE_KEYWORDS.items()
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _repos_for_narrative(nl: str) -> tuple[str, ...]:
+    """Repo slugs matching one lowercased narrative name.
+
+    Narrative names recur run to run, so the substring scans over the
+    protocol and keyword tables only ever happen once per distinct name.
+    """
+    found = []
+    # Direct protocol name match (PROTOCOL_REPOS keys are already lowercase)
+    for proto, repo in PROTOCOL_REPOS.items():
+        if proto in nl or nl in proto:
+            found.append(repo)
+    # Keyword-based match
+    for keyword, repos in _KEYWORD_TO_REPOS.items():
+        if keyword in nl:
+            found.extend(repos)
+    return tuple(found)
+
 
 def _select_repos(narrative_names: list[str]) -> list[str]:
     """Return repo slugs relevant to the given narrative category names."""
     selected: set[str] = set(_BASE_REPOS)
-
     for name in narrative_names:
-        nl = name.lower()
-        # Direct protocol name match
-        for proto, repo in PROTOCOL_REPOS.items():
-            if proto in nl or nl in proto:
-                selected.add(repo)
-        # Keyword-based match
-        for keyword, protos in _NARRATIVE_KEYWORDS.items():
-            if keyword in nl:
-                for p in protos:
-                    if p in PROTOCOL_REPOS:
-                        selected.add(PROTOCOL_REPOS[p])
-
+        selected.update(_repos_for_narrative(name.lower()))
     return list(selected)[:12]  # cap to stay well within rate limits
 
 
+@functools.lru_cache(maxsize=1)
 def _headers() -> dict:
+    """Built once per process — the token doesn't change at runtime.
+
+    Kept as per-request headers rather than session defaults: the session is
+    shared across every API and must not send the GitHub token elsewhere.
+    """
     token = os.getenv("GITHUB_TOKEN")
     h = {"Accept": "application/vnd.github.v3+json"}
     if token:
@@ -107,24 +130,36 @@ def _headers() -> dict:
     return h
 
 
-def _repo_stats(repo: str) -> dict | None:
-    h = _headers()
-
-    info_r = requests.get(f"{GITHUB_API}/repos/{repo}", headers=h, timeout=10)
-    if not info_r.ok:
-        return None
-    info = info_r.json()
+def _repo_stats(repo: str, pool: ThreadPoolExecutor) -> dict | None:
+    key = cache.make_key(f"{GITHUB_API}/repos/{repo}")
+    hit = cache.get(key, ttl_seconds=1800)
+    if hit is not None:
+        return hit
 
+    h = _headers()
     since = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-    commits_r = requests.get(
+
+    # The two GETs are independent, so overlap them on the shared pool
+    fut_info = pool.submit(HTTP.get, f"{GITHUB_API}/repos/{repo}", headers=h, timeout=10)
+    fut_commits = pool.submit(
+        HTTP.get,
         f"{GITHUB_API}/repos/{repo}/commits",
         headers=h,
         params={"since": since, "per_page": 100},
         timeout=10,
     )
-    commits_7d = len(commits_r.json()) if commits_r.ok and isinstance(commits_r.json(), list) else 0
 
-    return {
+    info_r = fut_info.result()
+    if not info_r.ok:
+        fut_commits.cancel()
+        return None
+    info = parse_json(info_r)
+
+    commits_r = fut_commits.result()
+    commits = parse_json(commits_r) if commits_r.ok else None
+    commits_7d = len(commits) if isinstance(commits, list) else 0
+
+    stats = {
         "repo":        repo,
         "stars":       info.get("stargazers_count"),
         "forks":       info.get("forks_count"),
@@ -132,6 +167,8 @@ def _repo_stats(repo: str) -> dict | None:
         "last_push":   (info.get("pushed_at") or "")[:10],
         "language":    info.get("language"),
     }
+    cache.set(key, stats)
+    return stats
 
 
 def get_developer_activity(narrative_names: list[str]) -> list[dict]:
@@ -139,13 +176,19 @@ def get_developer_activity(narrative_names: list[str]) -> list[dict]:
     repos   = _select_repos(narrative_names)
     results = []
 
-    for repo in repos:
-        try:
-            stats = _repo_stats(repo)
-            if stats:
-                results.append(stats)
-        except Exception:
-            pass
+    # Two pools: workers run _repo_stats, io runs the raw GETs it submits.
+    # Keeping them separate means a full worker pool can never starve the
+    # GETs it is waiting on.
+    with ThreadPoolExecutor(max_workers=8) as workers, \
+         ThreadPoolExecutor(max_workers=16) as io:
+        futures = {workers.submit(_repo_stats, repo, io): repo for repo in repos}
+        for fut in as_completed(futures):
+            try:
+                stats = fut.result()
+                if stats:
+                    results.append(stats)
+            except Exception:
+                pass
 
     # Most active repos first
     results.sort(key=lambda x: x.get("commits_7d", 0), reverse=True)
@@ -1,8 +1,11 @@
 """Macro data fetchers — DXY (yfinance) and yield curve (FRED API)."""
 import os
-import requests
+
 import yfinance as yf
 
+import cache
+from clients import HTTP, parse_json
+
 FRED_BASE = "https://api.stlouisfed.org/fred"
 
 
@@ -20,18 +23,30 @@ def _fred_latest(series_id: str) -> float | None:
         "limit": 10,
         "file_type": "json",
     }
-    resp = requests.get(url, params=params, timeout=10)
+    # Treasury yields update once a day — 6h TTL still catches the release
+    key = cache.make_key(url, {"series_id": series_id})
+    hit = cache.get(key, ttl_seconds=21600)
+    if hit is not None:
+        return hit
+
+    resp = HTTP.get(url, params=params, timeout=10)
     resp.raise_for_status()
 
-    for obs in resp.json().get("observations", []):
+    for obs in parse_json(resp).get("observations", []):
         val = obs.get("value", ".")
         if val != ".":
+            cache.set(key, float(val))
             return float(val)
     return None
 
 
 def get_dxy() -> dict:
     """Fetch US Dollar Index — level, 1d/5d change, trend, and intraday move detection."""
+    key = cache.make_key("yfinance:DX-Y.NYB")
+    hit = cache.get(key, ttl_seconds=3600)
+    if hit is not None:
+        return hit
+
     daily = yf.Ticker("DX-Y.NYB").history(period="10d", interval="1d")
     if daily.empty or len(daily) < 2:
         raise ValueError("No DXY data")
@@ -62,7 +77,7 @@ def get_dxy() -> dict:
     except Exception:
         pass
 
-    return {
+    result = {
         "level":                round(current,  3),
         "change_1d_pct":        round(change_1d, 3),
         "change_5d_pct":        round(change_5d, 3),
@@ -70,6 +85,8 @@ def get_dxy() -> dict:
         "intraday_change_pct":  intraday_change,
         "significant_intraday": significant_intraday,
     }
+    cache.set(key, result)
+    return result
 
 
 def get_yield_curve() -> dict:
@@ -1,20 +1,54 @@
+import threading
+import time
+
 import yfinance as yf
 from config import STOCK_INDICES, SECTOR_ETFS
 
+_BATCH_TTL = 300  # seconds
+_batch_lock = threading.Lock()
+_batch = None  # (fetched_at, DataFrame)
+
+
+def _download_batch():
+    """One yf.download covering every index + sector ticker, memoized briefly.
+
+    Per-ticker Ticker().history() calls cost ~15 Yahoo round trips per run.
+    A single batched download fetches them all at once, and the short TTL
+    lets get_indices_data and get_sector_performance — which run
+    concurrently — share the same frame instead of downloading twice.
+    """
+    global _batch
+    with _batch_lock:
+        if _batch is not None and time.time() - _batch[0] < _BATCH_TTL:
+            return _batch[1]
+
+        tickers = list(STOCK_INDICES.values()) + list(SECTOR_ETFS.values())
+        df = yf.download(
+            tickers,
+            period="5d",
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            auto_adjust=True,
+        )
+        if df is None or df.empty:
+            raise ValueError("yf.download returned no data")
+        _batch = (time.time(), df)
+        return df
+
 
-def _fetch_ticker_performance(ticker: str, period: str = "5d") -> dict:
-    """Return 1d and 5d percentage change for a given ticker."""
-    t = yf.Ticker(ticker)
-    hist = t.history(period=period)
+def _ticker_performance(df, ticker: str) -> dict:
+    """Return 1d and 5d percentage change for a ticker from the batched frame."""
+    closes = df[ticker]["Close"].dropna()
 
-    if len(hist) < 2:
+    if len(closes) < 2:
         return {"ticker": ticker, "error": "insufficient data"}
 
-    prev_close = hist["Close"].iloc[-2]
-    current = hist["Close"].iloc[-1]
+    prev_close = closes.iloc[-2]
+    current = closes.iloc[-1]
     change_1d = ((current - prev_close) / prev_close) * 100
 
-    first = hist["Close"].iloc[0]
+    first = closes.iloc[0]
     change_5d = ((current - first) / first) * 100
 
     return {
@@ -27,10 +61,11 @@ def _fetch_ticker_performance(ticker: str, period: str = "5d") -> dict:
 
 def get_indices_data() -> dict:
     """Fetch performance for major market indices."""
+    df = _download_batch()
     results = {}
     for name, ticker in STOCK_INDICES.items():
         try:
-            results[name] = _fetch_ticker_performance(ticker)
+            results[name] = _ticker_performance(df, ticker)
         except Exception as e:
             results[name] = {"ticker": ticker, "error": str(e)}
     return results
@@ -38,10 +73,11 @@ def get_indices_data() -> dict:
 
 def get_sector_performance() -> dict:
     """Fetch 1d and 5d performance for all 11 GICS sector ETFs."""
+    df = _download_batch()
     results = {}
     for sector, ticker in SECTOR_ETFS.items():
         try:
-            results[sector] = _fetch_ticker_performance(ticker)
+            results[sector] = _ticker_performance(df, ticker)
         except Exception as e:
             results[sector] = {"ticker": ticker, "error": str(e)}
     return results
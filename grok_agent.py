@@ -1,24 +1,18 @@
+import functools
 import os
+
 from openai import OpenAI
 from config import GROK_MODEL, CRYPTO_WATCHLIST
 
 XAI_BASE_URL = "https://api.x.ai/v1"
 
+# Frozen at import — the watchlist doesn't change at runtime, so the prompt
+# only needs assembling once, not on every pulse request
+_SYMBOLS = ", ".join(c["symbol"] for c in CRYPTO_WATCHLIST)
 
-def _setup_client() -> OpenAI:
-    api_key = os.getenv("XAI_API_KEY")
-    if not api_key:
-        raise ValueError("XAI_API_KEY is not set in your .env file")
-    return OpenAI(api_key=api_key, base_url=XAI_BASE_URL)
-
-
-def get_x_social_pulse() -> str:
-    client = _setup_client()
-
-    symbols = ", ".join(c["symbol"] for c in CRYPTO_WATCHLIST)
-    prompt = f"""You have real-time access to X (Twitter). Search X right now and give me a sharp crypto social pulse report.
+_PROMPT = f"""You have real-time access to X (Twitter). Search X right now and give me a sharp crypto social pulse report.
 
-Focus on: {symbols}, plus any other crypto narratives gaining traction on X today.
+Focus on: {_SYMBOLS}, plus any other crypto narratives gaining traction on X today.
 
 Structure your response exactly like this:
 
@@ -45,9 +39,21 @@ Rules:
 - Keep total length under 300 words.
 """
 
-    response = client.chat.completions.create(
+
+@functools.lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    """One client per process — each OpenAI() spins up a fresh httpx pool,
+    so recreating it per call threw away warm TLS connections to x.ai."""
+    api_key = os.getenv("XAI_API_KEY")
+    if not api_key:
+        raise ValueError("XAI_API_KEY is not set in your .env file")
+    return OpenAI(api_key=api_key, base_url=XAI_BASE_URL)
+
+
+def get_x_social_pulse() -> str:
+    response = _client().chat.completions.create(
         model=GROK_MODEL,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[{"role": "user", "content": _PROMPT}],
         timeout=60,
     )
     return response.choices[0].message.content
@@ -1,4 +1,5 @@
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,9 +16,9 @@ from fetchers.stocks import get_indices_data, get_sector_performance
 from fetchers.macro import get_dxy, get_yield_curve
 from fetchers.derivatives import get_crypto_derivatives
 from fetchers.calendar import get_upcoming_events
-from fetchers.defillama import get_protocol_tvl, get_chain_tvl, get_stablecoin_supply
+from fetchers.defillama import get_defillama_bundle
 from fetchers.github import get_developer_activity
-from agent import generate_market_update
+from agent import generate_market_update, serialize_payload
 from grok_agent import get_x_social_pulse
 from telegram_bot import send_message
 
@@ -33,34 +34,54 @@ def _safe_fetch(label: str, fn, fallback):
         return fallback
 
 
+def _fetch_all(specs: list[tuple[str, str, object, object]]) -> dict:
+    """Run (key, label, fn, fallback) fetch specs concurrently via _safe_fetch.
+
+    Each fetcher is independent I/O, so total wall time is the slowest
+    fetcher instead of the sum of all of them.
+    """
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        futures = {
+            key: pool.submit(_safe_fetch, label, fn, fallback)
+            for key, label, fn, fallback in specs
+        }
+        return {key: fut.result() for key, fut in futures.items()}
+
+
 def build_crypto_payload() -> dict:
     print("\nFetching crypto data...")
     # Fetch categories first — names feed into GitHub auto-selection
     categories = _safe_fetch("Category narratives + lifecycle", get_top_categories, [])
     narrative_names = [c["name"] for c in categories[:10]]
 
-    return {
-        "watchlist":                 _safe_fetch("Watchlist prices (BTC/SOL/HYPE)", get_watchlist_data, []),
-        "trending_coins":            _safe_fetch("Trending coins", get_trending_coins, []),
-        "global_market":             _safe_fetch("Global market stats", get_global_market, {}),
-        "categories_by_performance": categories,
-        "derivatives":               _safe_fetch("Crypto derivatives (Binance+Deribit)", get_crypto_derivatives, {}),
-        "defi_protocol_tvl":         _safe_fetch("DeFiLlama protocol TVL", get_protocol_tvl, []),
-        "chain_tvl":                 _safe_fetch("DeFiLlama chain TVL", get_chain_tvl, []),
-        "stablecoin_supply":         _safe_fetch("Stablecoin supply", get_stablecoin_supply, {}),
-        "developer_activity":        _safe_fetch("GitHub dev activity", lambda: get_developer_activity(narrative_names), []),
-    }
+    payload = _fetch_all([
+        ("watchlist",        "Watchlist prices (BTC/SOL/HYPE)", get_watchlist_data, []),
+        ("trending_coins",   "Trending coins", get_trending_coins, []),
+        ("global_market",    "Global market stats", get_global_market, {}),
+        ("derivatives",      "Crypto derivatives (Binance+Deribit)", get_crypto_derivatives, {}),
+        # One call covers all three DeFiLlama datasets with overlapped round trips
+        ("llama",            "DeFiLlama (TVL + chains + stablecoins)", get_defillama_bundle,
+                             {"protocols": [], "chains": [], "stablecoins": {}}),
+        ("developer_activity", "GitHub dev activity", lambda: get_developer_activity(narrative_names), []),
+    ])
+    llama = payload.pop("llama")
+
+    payload["categories_by_performance"] = categories
+    payload["defi_protocol_tvl"]         = llama["protocols"]
+    payload["chain_tvl"]                 = llama["chains"]
+    payload["stablecoin_supply"]         = llama["stablecoins"]
+    return payload
 
 
 def build_stock_payload() -> dict:
     print("\nFetching stock + macro data...")
-    return {
-        "major_indices":   _safe_fetch("Major indices", get_indices_data, {}),
-        "sector_etfs":     _safe_fetch("Sector ETFs", get_sector_performance, {}),
-        "dxy":             _safe_fetch("DXY", get_dxy, {}),
-        "yield_curve":     _safe_fetch("Yield curve (FRED)", get_yield_curve, {}),
-        "upcoming_events": _safe_fetch("Economic calendar", get_upcoming_events, []),
-    }
+    return _fetch_all([
+        ("major_indices",   "Major indices", get_indices_data, {}),
+        ("sector_etfs",     "Sector ETFs", get_sector_performance, {}),
+        ("dxy",             "DXY", get_dxy, {}),
+        ("yield_curve",     "Yield curve (FRED)", get_yield_curve, {}),
+        ("upcoming_events", "Economic calendar", get_upcoming_events, []),
+    ])
 
 
 def main():
@@ -69,14 +90,21 @@ def main():
     print(f"  Market Update Agent — {date_str}")
     print(f"{'='*50}")
 
-    crypto_data = build_crypto_payload()
-    stock_data = build_stock_payload()
-
-    print("\nGenerating market analysis with Gemini 2.5...")
-    crypto_analysis, stock_analysis = generate_market_update(crypto_data, stock_data)
-
-    print("Fetching X social pulse with Grok...")
-    social_pulse = _safe_fetch("X social pulse (Grok)", get_x_social_pulse, "")
+    # Payload builders hit disjoint APIs, and the Grok pulse needs neither
+    # payload — kick all three off together so the two LLM calls overlap
+    # with each other and with the data fetch
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        fut_grok = pool.submit(_safe_fetch, "X social pulse (Grok)", get_x_social_pulse, "")
+        fut_crypto = pool.submit(build_crypto_payload)
+        fut_stock = pool.submit(build_stock_payload)
+        crypto_data = fut_crypto.result()
+        stock_data = fut_stock.result()
+
+        print("\nGenerating market analysis with Gemini 2.5...")
+        crypto_analysis, stock_analysis = generate_market_update(serialize_payload(crypto_data, stock_data))
+
+        print("Fetching X social pulse with Grok...")
+        social_pulse = fut_grok.result()
 
     header = f"🗓 *Daily Market Update — {date_str}*\n{'─' * 34}\n\n"
     crypto_msg = header + crypto_analysis
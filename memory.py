@@ -1,41 +1,164 @@
 """File I/O layer for all .md memory files. No AI logic here."""
+import atexit
+import fcntl
 import json
+import os
+import queue
+import re
 import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def _dumps_line(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 BASE_DIR = Path(__file__).parent.resolve()
 
-_CONV_FILE      = BASE_DIR / "conversation_history.json"
+_CONV_FILE      = BASE_DIR / "conversation_history.json"  # legacy pre-JSONL store, read-only
+_HISTORY_DIR    = BASE_DIR / "history"  # one append-only .jsonl per chat
 _SOUL_TRACKER   = BASE_DIR / "soul_tracker.json"
+_PAYLOAD_FP     = BASE_DIR / "payload_fingerprint.json"
 _MAX_STORED     = 80    # messages kept on disk per chat
 _MAX_IN_PROMPT  = 20    # messages passed into the AI prompt (keeps tokens manageable)
 _MAX_MSG_CHARS  = 4000  # per-message content cap (prevents file bloat)
+_TRUNC_HEAD     = 2000  # chars kept from the start of an over-cap message
+_TRUNC_TAIL     = 1000  # chars kept from its end — the close often carries the conclusion
+_MAX_PROMPT_MSG_CHARS = 2000  # per-message cap inside the AI prompt (one pasted wall of text shouldn't eat the context)
 _SOUL_CORRECTION_THRESHOLD = 5   # corrections before SOUL.md refinement triggers
 _SOUL_DAY_THRESHOLD        = 3   # minimum days between soul updates
 
-_conv_lock = threading.Lock()   # guards all reads/writes to conversation_history.json
+_COMPACT_EVERY  = 50    # appends per chat between trims back to _MAX_STORED lines
+
+_conv_lock = threading.Lock()   # guards all reads/writes to conversation history files
+_append_counts: dict[str, int] = {}  # chat_id -> appends since process start
+_conv_cache: dict[str, tuple[int, list]] = {}  # chat_id -> (mtime_ns, parsed tail)
+_ts_cache: tuple[int, str] = (-1, "")  # (minute bucket, rendered timestamp)
+
+_FILE_CACHE: dict[str, tuple[int, str]] = {}  # name -> (mtime_ns, content); busts automatically on edit
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Advisory exclusive lock on a sidecar .lock file.
+
+    Serializes read-modify-write cycles across processes — the bot and a
+    manual main.py run can both touch the .md logs — where the in-process
+    threading locks can't reach.
+    """
+    lock_path = path.with_suffix(path.suffix + ".lock")
+    with open(lock_path, "w") as lf:
+        fcntl.flock(lf, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lf, fcntl.LOCK_UN)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write to a sibling temp file, then os.replace over the target.
+
+    A crash mid-write leaves the old file intact instead of a truncated one
+    that sends every later read down a silent empty-fallback path.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    _atomic_write_bytes(path, text.encode("utf-8"))
+
+
+_PATH_CACHE: dict[str, Path] = {}  # name -> resolved Path; names are a small fixed set
 
 
 def _safe_path(name: str) -> Path:
-    """Resolve name relative to BASE_DIR and raise if it escapes the project root."""
-    resolved = (BASE_DIR / name).resolve()
-    if not resolved.is_relative_to(BASE_DIR):
-        raise ValueError(f"Path traversal blocked: {name!r}")
-    return resolved
+    """Resolve name relative to BASE_DIR and raise if it escapes the project root.
+
+    Resolution hits the filesystem, so already-vetted names come from the
+    cache — every read_file/log write re-resolved the same handful of
+    paths otherwise.
+    """
+    path = _PATH_CACHE.get(name)
+    if path is None:
+        path = (BASE_DIR / name).resolve()
+        if not path.is_relative_to(BASE_DIR):
+            raise ValueError(f"Path traversal blocked: {name!r}")
+        _PATH_CACHE[name] = path
+    return path
 
 
 def read_file(name: str) -> str:
-    """Read a .md file from the project directory. Returns empty string if missing."""
+    """Read a .md file from the project directory. Returns empty string if missing.
+
+    Unchanged files (checked by mtime) are served from an in-memory cache —
+    SOUL/BRAIN/LEARNINGS are re-read on every Telegram message otherwise.
+    """
     path = _safe_path(name)
-    if not path.exists():
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
         return ""
-    return path.read_text(encoding="utf-8")
+    cached = _FILE_CACHE.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    content = path.read_text(encoding="utf-8")
+    _FILE_CACHE[name] = (mtime, content)
+    return content
+
+
+def _write_cached(name: str, content: str) -> None:
+    """Atomic write that also refreshes the read_file cache.
+
+    Writers know the new content already — storing it here saves the next
+    read_file from re-reading a file this process just produced.
+    """
+    path = _safe_path(name)
+    _atomic_write_text(path, content)
+    _FILE_CACHE[name] = (path.stat().st_mtime_ns, content)
+
+
+_ACTIVE_RULES_RE = re.compile(r"(## Active Rules.*?)(## Mistake Log|\Z)", re.DOTALL)
+
+
+def extract_active_rules(learnings: str, fallback_chars: int = 2000) -> str:
+    """Extract the ## Active Rules section from LEARNINGS.md content.
+
+    One regex pass instead of two linear find scans. If the Mistake Log marker
+    is missing the open-ended tail is capped at fallback_chars; with no Active
+    Rules marker at all, the first fallback_chars of the file are returned.
+    """
+    m = _ACTIVE_RULES_RE.search(learnings)
+    if m is None:
+        return learnings[:fallback_chars]
+    section = m.group(1)
+    if not m.group(2):
+        section = section[:fallback_chars]
+    return section.strip()
 
 
 def write_brain(content: str) -> None:
     """Overwrite BRAIN.md entirely — it's live state, not a log."""
-    _safe_path("BRAIN.md").write_text(content, encoding="utf-8")
+    _write_cached("BRAIN.md", content)
 
 
 def log_review(entry: str) -> None:
@@ -49,53 +172,143 @@ def log_learning(title: str, entry: str) -> None:
     _prepend_to_log("LEARNINGS.md", "<!-- Most recent first -->", formatted)
 
 
+def _history_path(chat_id: str) -> Path:
+    """Per-chat JSONL log path, traversal-checked like every other file."""
+    return _safe_path(f"history/{chat_id}.jsonl")
+
+
 def load_conversation(chat_id: str) -> list[dict]:
     """Load persisted conversation history for a chat_id.
     Returns the last _MAX_IN_PROMPT messages for use in the AI prompt.
     """
+    _WRITE_Q.join()  # read-your-writes: let queued appends land first
     with _conv_lock:
-        if not _CONV_FILE.exists():
-            return []
+        key = str(chat_id)
+        messages = []
         try:
-            data = json.loads(_CONV_FILE.read_text(encoding="utf-8"))
-            messages = data.get(str(chat_id), [])
-            return messages[-_MAX_IN_PROMPT:]
-        except (json.JSONDecodeError, Exception):
+            path = _history_path(key)
+            if path.exists():
+                # mtime-validated cache — every Telegram turn reloads the
+                # history, but the file only changes when a message lands
+                mtime = path.stat().st_mtime_ns
+                cached = _conv_cache.get(key)
+                if cached is not None and cached[0] == mtime:
+                    messages = cached[1]
+                else:
+                    # deque over the file object keeps only the tail in memory
+                    with path.open("rb") as f:
+                        tail = deque(f, maxlen=_MAX_IN_PROMPT)
+                    for line in tail:
+                        try:
+                            messages.append(_loads(line))
+                        except Exception:
+                            continue  # skip a torn/corrupt line, keep the rest
+                    _conv_cache[key] = (mtime, messages)
+            elif _CONV_FILE.exists():
+                # Chat predates the JSONL migration — read the legacy store
+                data = _loads(_CONV_FILE.read_bytes())
+                messages = data.get(str(chat_id), [])[-_MAX_IN_PROMPT:]
+        except Exception:
             return []
+        # Trim oversized messages here rather than in the prompt builder —
+        # keeps the cacheable prompt prefix small and stable across turns
+        return [
+            {**m, "content": m.get("content", "")[:_MAX_PROMPT_MSG_CHARS]}
+            for m in messages
+        ]
+
+
+_WRITE_Q: queue.Queue = queue.Queue()  # (chat_id, serialized line) pairs
+
+
+def _drain_writes() -> None:
+    """Background writer: batch queued lines per chat, append, compact.
+
+    One daemon thread owns all history disk I/O, so save_message returns
+    after serializing. Lines that arrive together while a write is in
+    progress coalesce into a single append per chat.
+    """
+    while True:
+        items = [_WRITE_Q.get()]
+        try:
+            while True:
+                items.append(_WRITE_Q.get_nowait())
+        except queue.Empty:
+            pass
+
+        batch: dict[str, list[bytes]] = {}
+        for key, line in items:
+            batch.setdefault(key, []).append(line)
+
+        for key, lines in batch.items():
+            try:
+                with _conv_lock:
+                    path = _history_path(key)
+                    path.parent.mkdir(exist_ok=True)
+                    with _file_lock(path):
+                        with path.open("ab") as f:
+                            f.write(b"".join(lines))
+                        _append_counts[key] = _append_counts.get(key, 0) + len(lines)
+                        if _append_counts[key] >= _COMPACT_EVERY:
+                            _compact_history(path)
+                            _append_counts[key] = 0
+            except Exception:
+                pass  # a failed flush must never kill the writer thread
+
+        for _ in items:
+            _WRITE_Q.task_done()
 
 
 def save_message(chat_id: str, role: str, content: str) -> None:
-    """Append a single message to the persisted conversation history."""
+    """Queue a single message for append to the chat's JSONL log.
+
+    The old single-file store re-read, re-trimmed and pretty-printed every
+    chat's history on each message. Serialization happens here; the disk
+    append runs on the background writer, so the caller doesn't block on
+    I/O. Every _COMPACT_EVERY appends the log is trimmed back to the last
+    _MAX_STORED lines.
+    """
+    # Middle-truncate oversized messages (pasted walls of text, long tool
+    # output) — keep the opening and the conclusion, drop the bulk
+    content = content.strip()
+    if len(content) > _MAX_MSG_CHARS:
+        content = content[:_TRUNC_HEAD] + "…[truncated]…" + content[-_TRUNC_TAIL:]
+
+    # Timestamps are minute-granular, so render once per minute bucket and
+    # reuse the string for every message landing within it
+    global _ts_cache
+    bucket = int(time.time() // 60)
+    if bucket != _ts_cache[0]:
+        t = time.gmtime(bucket * 60)
+        _ts_cache = (bucket, f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} "
+                             f"{t.tm_hour:02d}:{t.tm_min:02d} UTC")
+
+    msg = {
+        "role":      role,
+        "content":   content,
+        "timestamp": _ts_cache[1],
+    }
     try:
-        with _conv_lock:
-            data = {}
-            if _CONV_FILE.exists():
-                try:
-                    data = json.loads(_CONV_FILE.read_text(encoding="utf-8"))
-                except (json.JSONDecodeError, Exception):
-                    data = {}
-
-            key = str(chat_id)
-            if key not in data:
-                data[key] = []
-
-            data[key].append({
-                "role":      role,
-                "content":   content[:_MAX_MSG_CHARS],  # cap individual message size
-                "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
-            })
-
-            # Trim to max stored length
-            data[key] = data[key][-_MAX_STORED:]
-
-            # Atomic write: write to temp then rename
-            tmp = _CONV_FILE.with_suffix(".tmp")
-            tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-            tmp.replace(_CONV_FILE)
+        _WRITE_Q.put((str(chat_id), _dumps_line(msg) + b"\n"))
     except Exception:
         pass  # Never let a save failure break the conversation
 
 
+def _compact_history(path: Path) -> None:
+    """Rewrite a chat log keeping only its last _MAX_STORED lines, atomically."""
+    with path.open("rb") as f:
+        tail = deque(f, maxlen=_MAX_STORED)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(b"".join(tail))
+    tmp.replace(path)
+
+
+_writer_thread = threading.Thread(target=_drain_writes, name="history-writer", daemon=True)
+_writer_thread.start()
+
+atexit.register(_WRITE_Q.join)  # flush pending appends on clean shutdown
+
+
 def update_active_rules(new_rules_section: str) -> None:
     """Replace the ## Active Rules section in LEARNINGS.md with new content.
 
@@ -103,37 +316,39 @@ def update_active_rules(new_rules_section: str) -> None:
     and contain all rules. The trailing '---' separator is added automatically.
     """
     path = _safe_path("LEARNINGS.md")
-    content = path.read_text(encoding="utf-8")
+    with _file_lock(path):
+        content = path.read_text(encoding="utf-8")
 
-    start_marker = "## Active Rules (Current Best Version)"
-    end_marker   = "## Mistake Log"
+        start_marker = "## Active Rules (Current Best Version)"
+        end_marker   = "## Mistake Log"
 
-    start_idx = content.find(start_marker)
-    end_idx   = content.find(end_marker)
+        start_idx = content.find(start_marker)
+        end_idx   = content.find(end_marker)
 
-    if start_idx == -1 or end_idx == -1:
-        return  # Can't safely locate section — leave file untouched
+        if start_idx == -1 or end_idx == -1:
+            return  # Can't safely locate section — leave file untouched
 
-    updated = (
-        content[:start_idx]
-        + new_rules_section.rstrip()
-        + "\n\n---\n\n"
-        + content[end_idx:]
-    )
-    path.write_text(updated, encoding="utf-8")
+        updated = (
+            content[:start_idx]
+            + new_rules_section.rstrip()
+            + "\n\n---\n\n"
+            + content[end_idx:]
+        )
+        _write_cached("LEARNINGS.md", updated)
 
 
 def update_soul(new_content: str) -> None:
     """Overwrite SOUL.md with refined content."""
-    _safe_path("SOUL.md").write_text(new_content.rstrip() + "\n", encoding="utf-8")
+    _write_cached("SOUL.md", new_content.rstrip() + "\n")
 
 
 def record_soul_correction() -> None:
     """Increment the correction counter that gates SOUL.md refinement."""
     try:
         data = _load_soul_tracker()
+        data = dict(data)  # don't mutate the cached dict before the write lands
         data["corrections_since_last_update"] = data.get("corrections_since_last_update", 0) + 1
-        _SOUL_TRACKER.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        _save_soul_tracker(data)
     except Exception:
         pass
 
@@ -161,33 +376,83 @@ def mark_soul_updated() -> None:
     """Reset the correction counter and stamp today as the last soul update."""
     try:
         data = _load_soul_tracker()
+        data = dict(data)
         data["corrections_since_last_update"] = 0
         data["last_update_date"] = datetime.now(timezone.utc).isoformat()
-        _SOUL_TRACKER.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        _save_soul_tracker(data)
     except Exception:
         pass
 
 
+def load_payload_fingerprint() -> dict:
+    """Load the previous run's market-payload fingerprint. Empty dict if missing."""
+    if not _PAYLOAD_FP.exists():
+        return {}
+    try:
+        return _loads(_PAYLOAD_FP.read_bytes())
+    except Exception:
+        return {}
+
+
+def save_payload_fingerprint(fingerprint: dict) -> None:
+    """Persist the current run's market-payload fingerprint for the next run."""
+    try:
+        _atomic_write_bytes(_PAYLOAD_FP, _dumps(fingerprint))
+    except Exception:
+        pass
+
+
+_soul_cache: tuple[int, dict] | None = None  # (mtime_ns, parsed tracker)
+
+
 def _load_soul_tracker() -> dict:
-    if not _SOUL_TRACKER.exists():
+    """Parsed soul tracker, served from memory while the file is unchanged."""
+    global _soul_cache
+    try:
+        mtime = _SOUL_TRACKER.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
+    if _soul_cache is not None and _soul_cache[0] == mtime:
+        return _soul_cache[1]
     try:
-        return json.loads(_SOUL_TRACKER.read_text(encoding="utf-8"))
+        data = _loads(_SOUL_TRACKER.read_bytes())
     except Exception:
         return {}
+    _soul_cache = (mtime, data)
+    return data
 
 
-def _prepend_to_log(filename: str, marker: str, entry: str) -> None:
-    """Find marker comment in file and insert entry immediately after it."""
-    path = _safe_path(filename)
-    content = path.read_text(encoding="utf-8")
+def _save_soul_tracker(data: dict) -> None:
+    """Write-through: persist atomically and refresh the in-memory cache."""
+    global _soul_cache
+    _atomic_write_bytes(_SOUL_TRACKER, _dumps(data))
+    _soul_cache = (_SOUL_TRACKER.stat().st_mtime_ns, data)
+
+
+_marker_offsets: dict[str, int] = {}  # filename -> last known marker index
 
-    idx = content.find(marker)
-    if idx == -1:
-        # Marker not found — append to end rather than silently failing
-        path.write_text(content.rstrip() + "\n\n" + entry + "\n", encoding="utf-8")
-        return
 
-    insert_at = idx + len(marker)
-    updated = content[:insert_at] + "\n\n" + entry + "\n" + content[insert_at:]
-    path.write_text(updated, encoding="utf-8")
+def _prepend_to_log(filename: str, marker: str, entry: str) -> None:
+    """Find marker comment in file and insert entry immediately after it.
+
+    The marker sits near the top and entries go below it, so its offset is
+    stable across appends — remember it and only fall back to a full
+    content.find scan when the cached position no longer matches (e.g. the
+    file was hand-edited above the marker).
+    """
+    path = _safe_path(filename)
+    with _file_lock(path):
+        content = path.read_text(encoding="utf-8")
+
+        idx = _marker_offsets.get(filename, -1)
+        if idx < 0 or content[idx:idx + len(marker)] != marker:
+            idx = content.find(marker)
+        _marker_offsets[filename] = idx
+        if idx == -1:
+            # Marker not found — append to end rather than silently failing
+            _write_cached(filename, content.rstrip() + "\n\n" + entry + "\n")
+            return
+
+        insert_at = idx + len(marker)
+        updated = content[:insert_at] + "\n\n" + entry + "\n" + content[insert_at:]
+        _write_cached(filename, updated)
@@ -1,66 +1,210 @@
 import os
 import re
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import encode_multipart_formdata
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+_JSON_HDRS = {"Content-Type": "application/json"}
 
 TELEGRAM_API = "https://api.telegram.org"
 MAX_MSG_LENGTH = 4000  # Buffer below Telegram's 4096 hard limit
 
+# One pooled session per process — keep-alive to api.telegram.org instead of
+# a fresh TCP+TLS handshake on every send and every long-poll cycle
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+class _RateLimiter:
+    """Token-bucket pacing for Telegram's flood limits (~30 msg/s global,
+    ~1 msg/s per chat with short bursts tolerated).
+
+    acquire() sleeps only when a bucket is actually empty, replacing the
+    blind 0.1s pause between chunks; the 429 Retry-After handler in
+    _post_with_retry stays as the last line of defense.
+    """
+
+    def __init__(self, global_rate: float = 30.0, chat_rate: float = 1.0,
+                 chat_burst: float = 3.0):
+        self._lock = threading.Lock()
+        self._global_rate = global_rate
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        now = time.monotonic()
+        self._global = (global_rate, now)           # (tokens, last refill)
+        self._chats: dict[str, tuple[float, float]] = {}
+
+    def acquire(self, chat_id) -> None:
+        key = str(chat_id)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                g_tokens, g_ts = self._global
+                g_tokens = min(self._global_rate,
+                               g_tokens + (now - g_ts) * self._global_rate)
+                c_tokens, c_ts = self._chats.get(key, (self._chat_burst, now))
+                c_tokens = min(self._chat_burst,
+                               c_tokens + (now - c_ts) * self._chat_rate)
+
+                if g_tokens >= 1.0 and c_tokens >= 1.0:
+                    self._global = (g_tokens - 1.0, now)
+                    self._chats[key] = (c_tokens - 1.0, now)
+                    return
+
+                wait = max((1.0 - g_tokens) / self._global_rate,
+                           (1.0 - c_tokens) / self._chat_rate)
+            time.sleep(wait)
+
+
+_RL = _RateLimiter()
+
+_bot_base: str | None = None
+_bot_base_lock = threading.Lock()
+
+
+def _base_url() -> str | None:
+    """Lazily cached '{TELEGRAM_API}/bot<token>' prefix; None if no token.
+
+    Computed once so the hot send/poll paths stop re-reading the env var and
+    re-concatenating the URL on every call.
+    """
+    global _bot_base
+    if _bot_base is None:
+        with _bot_base_lock:
+            if _bot_base is None:
+                token = os.getenv("TELEGRAM_BOT_TOKEN")
+                if token:
+                    _bot_base = f"{TELEGRAM_API}/bot{token}"
+    return _bot_base
+
+
+_endpoint_urls: dict | None = None
+
+
+def _urls() -> dict:
+    """Full endpoint URLs, built once; empty dict while the token is unset.
+
+    A lazy global rather than lru_cache — caching the missing-token case
+    would pin the failure even after the env var appears.
+    """
+    global _endpoint_urls
+    if _endpoint_urls is None:
+        base = _base_url()
+        if not base:
+            return {}
+        _endpoint_urls = {
+            "send":    f"{base}/sendMessage",
+            "edit":    f"{base}/editMessageText",
+            "photo":   f"{base}/sendPhoto",
+            "updates": f"{base}/getUpdates",
+        }
+    return _endpoint_urls
+
+
+_BLANKS_RE = re.compile(r'\n{3,}')
+
+
+def _compact(text: str) -> str:
+    """Collapse runs of blank lines — cosmetic-only shrinkage."""
+    return _BLANKS_RE.sub('\n\n', text).rstrip()
+
 
 def _split_message(text: str) -> list[str]:
     """Split a long message at newlines to avoid cutting mid-sentence."""
     if len(text) <= MAX_MSG_LENGTH:
         return [text]
 
-    chunks = []
-    current = ""
+    # Barely over the limit? Collapsing blank-line runs can save an entire
+    # second message (and its round trip + pacing delay)
+    if len(text) <= MAX_MSG_LENGTH * 1.05:
+        compacted = _compact(text)
+        if len(compacted) <= MAX_MSG_LENGTH:
+            return [compacted]
+        text = compacted  # still too long, but split the tighter version
+
+    # Accumulate lines and join once per chunk — repeated `current + line`
+    # concatenation reallocated the whole buffer per line, going quadratic
+    # on replies near the limit
+    chunks: list[str] = []
+    buf: list[str] = []
+    size = 0
     for line in text.split("\n"):
-        candidate = current + line + "\n"
-        if len(candidate) > MAX_MSG_LENGTH:
-            if current:
-                chunks.append(current.strip())
-            current = line + "\n"
+        ln = len(line) + 1  # +1 for the newline that joins it
+        if size + ln > MAX_MSG_LENGTH:
+            if buf:
+                chunks.append("\n".join(buf).strip())
+            buf = [line]
+            size = ln
         else:
-            current = candidate
+            buf.append(line)
+            size += ln
 
-    if current.strip():
-        chunks.append(current.strip())
+    tail = "\n".join(buf).strip()
+    if tail:
+        chunks.append(tail)
 
     return chunks
 
 
+# One alternation so the string is walked once: **bold** → *bold*, and a
+# leading * bullet → -. Leftmost-first matching keeps the same precedence
+# the old two-pass version had.
+_MD_RE = re.compile(r'\*\*(.+?)\*\*|^(\s*)\*(\s+)', re.DOTALL | re.MULTILINE)
+
+
+def _md_repl(m: re.Match) -> str:
+    bold = m.group(1)
+    if bold is not None:
+        return f"*{bold}*"
+    return f"{m.group(2)}-{m.group(3)}"
+
+
 def _to_telegram_markdown(text: str) -> str:
     """Convert standard markdown to Telegram's legacy Markdown format."""
-    # **bold** → *bold*
-    text = re.sub(r'\*\*(.+?)\*\*', r'*\1*', text, flags=re.DOTALL)
-    # Replace * used as a bullet (line starts with optional whitespace then * then space)
-    text = re.sub(r'(?m)^(\s*)\*(\s+)', r'\1-\2', text)
-    return text
+    return _MD_RE.sub(_md_repl, text)
 
 
 def _post_with_retry(url: str, timeout: int = 15, **kwargs) -> requests.Response:
     """POST with automatic back-off on 429 (Too Many Requests)."""
-    response = requests.post(url, timeout=timeout, **kwargs)
+    response = _SESSION.post(url, timeout=timeout, **kwargs)
     if response.status_code == 429:
         retry_after = int(response.headers.get("Retry-After", 5))
         time.sleep(retry_after)
-        response = requests.post(url, timeout=timeout, **kwargs)
+        response = _SESSION.post(url, timeout=timeout, **kwargs)
     return response
 
 
-def get_updates(offset: int) -> list:
-    """Long-poll Telegram for new updates. Returns list of update dicts, empty list on error."""
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not bot_token:
+def get_updates(offset: int, long_poll_timeout: int = 50) -> list:
+    """Long-poll Telegram for new updates. Returns list of update dicts, empty list on error.
+
+    long_poll_timeout is passed to Telegram's getUpdates — the server holds the
+    request open until a message arrives or the timeout elapses, so idle periods
+    cost one blocked call instead of a stream of empty polls. The HTTP timeout
+    is kept strictly above it to avoid spurious client-side disconnects.
+    """
+    urls = _urls()
+    if not urls:
         return []
 
-    url = f"{TELEGRAM_API}/bot{bot_token}/getUpdates"
-    params = {"offset": offset, "timeout": 30}
+    params = {"offset": offset, "timeout": long_poll_timeout}
 
     try:
-        response = requests.get(url, params=params, timeout=35)
+        response = _SESSION.get(urls["updates"], params=params, timeout=long_poll_timeout + 10)
         if response.ok:
-            return response.json().get("result", [])
+            # orjson parses straight from the bytes — no utf-8 decode pass
+            return _loads(response.content).get("result", [])
     except requests.exceptions.RequestException:
         pass
 
@@ -70,69 +214,129 @@ def get_updates(offset: int) -> list:
 def send_reply(chat_id: str, text: str) -> None:
     """Send a message to a specific chat_id. Splits if over 4000 chars."""
     text = _to_telegram_markdown(text)
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    urls = _urls()
 
-    if not bot_token:
+    if not urls:
         raise ValueError("TELEGRAM_BOT_TOKEN not set in your .env file")
 
-    url = f"{TELEGRAM_API}/bot{bot_token}/sendMessage"
+    url = urls["send"]
     chunks = _split_message(text)
 
-    for i, chunk in enumerate(chunks):
-        if i > 0:
-            time.sleep(0.1)  # avoid rate limiting on multi-chunk messages
+    for chunk in chunks:
+        _RL.acquire(chat_id)  # waits only when a flood-limit bucket is empty
         payload = {"chat_id": chat_id, "text": chunk, "parse_mode": "Markdown"}
-        response = _post_with_retry(url, json=payload)
+        # Serialize once ourselves — skips requests' internal json encoding
+        response = _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
 
         if not response.ok:
             payload.pop("parse_mode")
-            response = _post_with_retry(url, json=payload)
+            response = _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
             response.raise_for_status()
 
 
+def send_placeholder(chat_id: str, text: str) -> int | None:
+    """Send a single message and return its message_id for later in-place edits.
+
+    Returns None on any failure — callers fall back to a normal one-shot reply.
+    """
+    urls = _urls()
+    if not urls:
+        return None
+
+    url = urls["send"]
+    try:
+        response = _post_with_retry(url, data=_dumps({"chat_id": chat_id, "text": text}),
+                                    headers=_JSON_HDRS)
+        if response.ok:
+            return _loads(response.content).get("result", {}).get("message_id")
+    except requests.exceptions.RequestException:
+        pass
+    return None
+
+
+def edit_message(chat_id: str, message_id: int, text: str) -> None:
+    """Edit a previously sent message in place (used for streaming updates).
+
+    Partial text often has unbalanced markdown, so parse failures fall back to
+    plain text; any remaining error (e.g. 'message is not modified') is ignored.
+    """
+    urls = _urls()
+    if not urls:
+        return
+
+    url = urls["edit"]
+    text = _to_telegram_markdown(text)[:MAX_MSG_LENGTH]
+    payload = {"chat_id": chat_id, "message_id": message_id,
+               "text": text, "parse_mode": "Markdown"}
+    try:
+        response = _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
+        if not response.ok:
+            payload.pop("parse_mode")
+            _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
+    except requests.exceptions.RequestException:
+        pass
+
+
+def finalize_stream(chat_id: str, message_id: int, text: str) -> None:
+    """Replace a streaming placeholder with the final text, splitting if needed."""
+    chunks = _split_message(_to_telegram_markdown(text))
+    edit_message(chat_id, message_id, chunks[0])
+    for chunk in chunks[1:]:
+        send_reply(chat_id, chunk)  # send_reply paces itself via _RL
+
+
 def send_photo(chat_id: str, image_bytes: bytes, caption: str = "") -> None:
     """Send a photo to a specific chat_id via multipart/form-data."""
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not bot_token:
+    urls = _urls()
+    if not urls:
         raise ValueError("TELEGRAM_BOT_TOKEN not set in your .env file")
 
-    url = f"{TELEGRAM_API}/bot{bot_token}/sendPhoto"
+    url = urls["photo"]
     caption = caption[:1024]  # Telegram hard limit
 
-    files = {"photo": ("chart.png", image_bytes, "image/png")}
-    data = {"chat_id": chat_id, "caption": caption, "parse_mode": "Markdown"}
-
-    response = _post_with_retry(url, timeout=30, data=data, files=files)
+    # Encode the multipart body once — the 429 retry inside _post_with_retry
+    # then reposts the same bytes instead of rebuilding the form each time
+    fields = {
+        "chat_id":    str(chat_id),
+        "caption":    caption,
+        "parse_mode": "Markdown",
+        "photo":      ("chart.png", image_bytes, "image/png"),
+    }
+    body, content_type = encode_multipart_formdata(fields)
+
+    response = _post_with_retry(url, timeout=30, data=body,
+                                headers={"Content-Type": content_type})
     if not response.ok:
         # Retry without Markdown if parse failed
-        data.pop("parse_mode")
-        response = _post_with_retry(url, timeout=30, data=data, files=files)
+        fields.pop("parse_mode")
+        body, content_type = encode_multipart_formdata(fields)
+        response = _post_with_retry(url, timeout=30, data=body,
+                                    headers={"Content-Type": content_type})
         response.raise_for_status()
 
 
 def send_message(text: str) -> None:
     """Send a message to the configured Telegram chat. Splits if over 4000 chars."""
     text = _to_telegram_markdown(text)
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    urls = _urls()
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
 
-    if not bot_token or not chat_id:
+    if not urls or not chat_id:
         raise ValueError(
             "TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set in your .env file"
         )
 
-    url = f"{TELEGRAM_API}/bot{bot_token}/sendMessage"
+    url = urls["send"]
     chunks = _split_message(text)
 
-    for i, chunk in enumerate(chunks):
-        if i > 0:
-            time.sleep(0.1)
+    for chunk in chunks:
+        _RL.acquire(chat_id)
         # Try Markdown first, fall back to plain text if parsing fails
         payload = {"chat_id": chat_id, "text": chunk, "parse_mode": "Markdown"}
-        response = _post_with_retry(url, json=payload)
+        response = _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
 
         if not response.ok:
             # Telegram rejected the markdown — retry as plain text
             payload.pop("parse_mode")
-            response = _post_with_retry(url, json=payload)
+            response = _post_with_retry(url, data=_dumps(payload), headers=_JSON_HDRS)
             response.raise_for_status()